@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 15:12:41
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : attribute_index.py
+# @License : Apache-2.0
+# @Desc    : 岗位结构化字段倒排(按字段取值预计算 jid 集合), 用于检索前过滤
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .query_cache import normalize_query
+
+FILTER_FIELDS = (
+    "location",
+    "edu_requirement",
+    "exp_requirement",
+    "company_type",
+    "company_industry",
+)
+
+FilterValue = Union[str, int, float, List[Union[str, int, float]]]
+
+
+def _is_scalar(value: object) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def normalize_filters(
+    filters: Optional[Mapping[str, FilterValue]],
+) -> Dict[str, Tuple[str, ...]]:
+    """
+    校验并归一化过滤条件, 返回 {字段: (取值, ...)}, 空值条件直接忽略
+    例: {"location": "上海", "edu_requirement": ["本科", "硕士"]}
+    """
+    out: Dict[str, Tuple[str, ...]] = {}
+    for field, wanted in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"unsupported filter field: {field}")
+        # 条件由模型生成: 只接受标量或标量列表, 字典、嵌套列表等其它类型的取值直接丢弃
+        if _is_scalar(wanted):
+            wanted = [wanted]
+        elif not isinstance(wanted, (list, tuple)):
+            wanted = []
+        values = tuple(
+            sorted({normalize_query(str(v)) for v in wanted if _is_scalar(v)} - {""})
+        )
+        if values:
+            out[field] = values
+    return out
+
+
+class AttributeIndex:
+    """
+    每个字段维护 取值 -> jid 集合, 查询时:
+        同一字段的多个取值取并集, 不同字段之间取交集
+        取值按包含匹配, 如 "上海" 可命中 "上海-浦东新区"
+    结果为有序 int64 jid 数组, 直接用于构造 FAISS IDSelector 或 NumPy 掩码
+    """
+
+    def __init__(self, fields: Tuple[str, ...] = FILTER_FIELDS, cache_size: int = 256):
+        self.fields = fields
+        self.cache_size = int(cache_size)
+        self.ready = False
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, Set[int]]] = {f: {} for f in fields}
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        self._values_of: Dict[int, Tuple[str, ...]] = {}
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values_of)
+
+    def _remove_locked(self, jid: int) -> None:
+        values = self._values_of.pop(jid, None)
+        if values is None:
+            return
+        for field, value in zip(self.fields, values):
+            postings = self._postings[field]
+            if (jids := postings.get(value)) is not None:
+                jids.discard(jid)
+                if not jids:
+                    del postings[value]
+            self._arrays.pop((field, value), None)
+
+    def _add_locked(self, jid: int, attrs: Mapping[str, Optional[str]]) -> None:
+        self._remove_locked(jid)
+        values = tuple(normalize_query(attrs.get(f) or "") for f in self.fields)
+        self._values_of[jid] = values
+        for field, value in zip(self.fields, values):
+            self._postings[field].setdefault(value, set()).add(jid)
+            self._arrays.pop((field, value), None)
+
+    def update(
+        self,
+        items: Iterable[Tuple[int, Mapping[str, Optional[str]]]],
+        removed: Iterable[int] = (),
+        only_missing: bool = False,
+    ) -> None:
+        """
+        写入/替换岗位字段并删除 removed 中的 jid, only_missing 语义同 LexicalIndex.update
+        """
+        with self._lock:
+            for jid in removed:
+                self._remove_locked(int(jid))
+            for jid, attrs in items:
+                if only_missing and jid in self._values_of:
+                    continue
+                self._add_locked(int(jid), attrs)
+            self._cache.clear()
+
+    def _value_array(self, field: str, value: str) -> np.ndarray:
+        key = (field, value)
+        if (arr := self._arrays.get(key)) is None:
+            arr = np.fromiter(self._postings[field][value], dtype=np.int64)
+            arr.sort()
+            self._arrays[key] = arr
+        return arr
+
+    def resolve(self, filters: Dict[str, Tuple[str, ...]]) -> np.ndarray:
+        """
+        返回满足 normalize_filters 结果的全部 jid(有序 int64)
+        """
+        key = tuple(sorted(filters.items()))
+        with self._lock:
+            if (cached := self._cache.get(key)) is not None:
+                self._cache.move_to_end(key)
+                return cached
+            result: Optional[np.ndarray] = None
+            for field, wanted in filters.items():
+                parts = [
+                    self._value_array(field, value)
+                    for value in self._postings[field]
+                    if value and any(w in value for w in wanted)
+                ]
+                if not parts:
+                    result = np.empty(0, dtype=np.int64)
+                    break
+                matched = parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+                result = (
+                    matched
+                    if result is None
+                    else np.intersect1d(result, matched, assume_unique=True)
+                )
+                if len(result) == 0:
+                    break
+            if result is None:
+                result = np.fromiter(self._values_of, dtype=np.int64)
+                result.sort()
+            result.setflags(write=False)
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result
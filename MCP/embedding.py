@@ -6,24 +6,97 @@
 # @Desc    : 嵌入模型类
 
 import asyncio
-from typing import List
+from typing import List, Optional
 from langchain.embeddings.base import Embeddings
-from openai import AsyncOpenAI
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+
+def _is_retryable(e: Exception) -> bool:
+    """
+    只有超时、连接错误、限流(429)与服务端错误(5xx)值得重试;
+    鉴权失败、参数错误、超出上下文长度等 4xx 重试也不会成功, 直接抛出
+    """
+    if isinstance(e, (APIConnectionError, asyncio.TimeoutError)):
+        # APITimeoutError 是 APIConnectionError 的子类
+        return True
+    if isinstance(e, APIStatusError):
+        return e.status_code == 429 or e.status_code >= 500
+    return False
 
 
 class AsyncOpenAIEmbeddings(Embeddings):
-    def __init__(self, base_url: str, api_key: str, model_name: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model_name: str,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        """
+        Args:
+            batch_size (int): 单次 embeddings.create 请求携带的文本数, <=1 时退化为逐条请求
+            max_concurrency (int): 同时在途的文档批次数, 单条查询不受此限制
+            max_retries (int): 单个批次遇到超时、连接错误、429、5xx 时的最大重试次数, 其它错误不重试
+            retry_backoff (float): 重试退避基数(秒), 第 n 次重试等待 retry_backoff * 2 ** n
+        """
         self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
         self.model_name = model_name
+        self.batch_size = max(1, int(batch_size))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = max(0.0, float(retry_backoff))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 同步接口会经由 asyncio.run 新建事件循环, 信号量需按循环重建
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _create_with_retry(self, inputs: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.embeddings.create(
+                    input=inputs, model=self.model_name
+                )
+                # 部分兼容实现不保证 data 顺序, 按 index 还原
+                data = sorted(response.data, key=lambda d: d.index)
+                if len(data) != len(inputs):
+                    raise ValueError(
+                        f"embedding count mismatch: expected {len(inputs)}, got {len(data)}"
+                    )
+                return [d.embedding for d in data]
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2**attempt))
+                attempt += 1
+
+    async def _embed_batch(self, inputs: List[str]) -> List[List[float]]:
+        async with self._get_semaphore():
+            return await self._create_with_retry(inputs)
 
     async def _get_embedding(self, text: str) -> List[float]:
-        response = await self.client.embeddings.create(
-            input=text, model=self.model_name
-        )
-        return response.data[0].embedding
+        # 单条查询走在线检索链路, 不与批量索引共用信号量, 避免排在整批文档请求之后
+        vectors = await self._create_with_retry([text])
+        return vectors[0]
 
     async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
-        return await asyncio.gather(*[self._get_embedding(text) for text in texts])
+        if not texts:
+            return []
+        batches = [
+            texts[i : i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        results = await asyncio.gather(*[self._embed_batch(b) for b in batches])
+        return [vec for batch in results for vec in batch]
 
     async def aembed_query(self, text: str) -> List[float]:
         return await self._get_embedding(text)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:48:33
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : embedding_cache.py
+# @License : Apache-2.0
+# @Desc    : 文档向量持久化缓存(SQLite, 按模型名 + 文本哈希索引)
+
+import os
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# SQLite 单条语句的参数个数上限默认为 999
+_MAX_VARIABLES = 900
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    表结构: embeddings(model, digest, vector) 以 (model, digest) 为主键,
+    vector 为 float32 原始字节; 文本未变的文档重建索引时直接复用, 不再请求 embedding 接口。
+    使用 WAL 模式, 同机多个 worker 可同时读写
+    """
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, digest BLOB NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, digest)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        按文本查询缓存, 返回与 texts 等长的列表, 未命中为 None
+        """
+        digests = [text_digest(t) for t in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(digests))
+        with self._lock:
+            for start in range(0, len(unique), _MAX_VARIABLES):
+                chunk = unique[start : start + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings "
+                    f"WHERE model = ? AND digest IN ({placeholders})",
+                    [self.model_name, *chunk],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[bytes(digest)] = np.frombuffer(blob, dtype=np.float32)
+        out = [found.get(d) for d in digests]
+        hit = sum(v is not None for v in out)
+        self.hits += hit
+        self.misses += len(out) - hit
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        rows = [
+            (
+                self.model_name,
+                text_digest(text),
+                np.asarray(vec, dtype=np.float32).tobytes(),
+            )
+            for text, vec in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
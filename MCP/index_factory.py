@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 13:26:05
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : index_factory.py
+# @License : Apache-2.0
+# @Desc    : 可配置的 FAISS 索引类型(Flat / IVF-Flat / IVF-PQ / HNSW)
+
+import os
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+from config.config import Config
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+INDEX_FILE = "index.faiss"
+FLAT_VECTORS_FILE = "vectors.npy"
+FLAT_NORMS_FILE = "norms.npy"
+FLAT_JIDS_FILE = "jids.npy"
+
+
+@dataclass
+class IndexSpec:
+    index_type: str = "flat"
+    nlist: int = 0  # 0 表示按 4 * sqrt(N) 自动确定
+    pq_m: int = 16
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    min_train_size: int = 10000  # 向量数不足时保持 Flat, 避免训练样本不足
+
+    @classmethod
+    def from_config(cls) -> "IndexSpec":
+        index_type = (Config.vector_index_type or "flat").lower()
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"unknown vector_index_type: {index_type}, expected one of {INDEX_TYPES}"
+            )
+        return cls(
+            index_type=index_type,
+            nlist=Config.vector_ivf_nlist,
+            pq_m=Config.vector_pq_m,
+            pq_nbits=Config.vector_pq_nbits,
+            hnsw_m=Config.vector_hnsw_m,
+            ef_construction=Config.vector_hnsw_ef_construction,
+            min_train_size=Config.vector_index_min_train_size,
+        )
+
+    def effective_type(self, ntotal: int) -> str:
+        if self.index_type == "flat" or ntotal < self.min_train_size:
+            return "flat"
+        # PQ 码本同样需要约 39 * 2^nbits 个训练样本
+        if self.index_type == "ivf_pq" and ntotal < 39 * (1 << self.pq_nbits):
+            return "flat"
+        return self.index_type
+
+    def resolve_nlist(self, ntotal: int) -> int:
+        nlist = self.nlist or int(4 * math.sqrt(max(ntotal, 1)))
+        # 每个聚类中心至少需要约 39 个训练样本
+        return max(1, min(nlist, ntotal // 39 or 1))
+
+    def resolve_pq_m(self, dim: int) -> int:
+        m = max(1, min(self.pq_m, dim))
+        while dim % m:
+            m -= 1
+        return m
+
+
+class IdFilter:
+    """
+    检索时的 jid 过滤条件, include 为白名单, exclude 为黑名单(int64 数组)
+    对 FAISS 索引转换为 IDSelector 在检索内部生效, 对 MmapFlatIndex 转换为 NumPy 掩码
+    """
+
+    def __init__(
+        self,
+        include: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None,
+    ):
+        self.include = None if include is None else np.unique(np.asarray(include, dtype=np.int64))
+        self.exclude = None if exclude is None else np.unique(np.asarray(exclude, dtype=np.int64))
+        self._selector = None
+        # IDSelector 由 SWIG 管理, 需持有 Python 引用避免被提前回收
+        self._refs: list = []
+
+    def mask(self, ids: np.ndarray) -> np.ndarray:
+        keep = np.ones(len(ids), dtype=bool)
+        if self.include is not None:
+            keep &= np.isin(ids, self.include, assume_unique=False)
+        if self.exclude is not None:
+            keep &= ~np.isin(ids, self.exclude, assume_unique=False)
+        return keep
+
+    def selector(self) -> faiss.IDSelector:
+        if self._selector is not None:
+            return self._selector
+        selector = None
+        if self.include is not None:
+            selector = faiss.IDSelectorBatch(self.include)
+            self._refs.append(selector)
+        if self.exclude is not None and len(self.exclude):
+            batch = faiss.IDSelectorBatch(self.exclude)
+            not_sel = faiss.IDSelectorNot(batch)
+            self._refs.extend([batch, not_sel])
+            if selector is None:
+                selector = not_sel
+            else:
+                selector = faiss.IDSelectorAnd(selector, not_sel)
+                self._refs.append(selector)
+        if selector is None:
+            selector = faiss.IDSelectorAll()
+            self._refs.append(selector)
+        self._selector = selector
+        return selector
+
+
+class MmapFlatIndex:
+    """
+    只读的内存映射 Flat 索引
+
+    向量以原始 float32 的 .npy 存放, 通过 np.load(mmap_mode="r") 映射,
+    同机多个 worker 共享同一份 page cache, 常驻内存不随 worker 数增长
+    接口与 FAISS 索引的 search / ntotal / d 保持一致
+    """
+
+    block_size = 65536
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors = np.load(os.path.join(path, FLAT_VECTORS_FILE), mmap_mode="r")
+        self.norms = np.load(os.path.join(path, FLAT_NORMS_FILE), mmap_mode="r")
+        self.jids = np.load(os.path.join(path, FLAT_JIDS_FILE), mmap_mode="r")
+        self.ntotal, self.d = self.vectors.shape
+
+    def search(
+        self, xq: np.ndarray, k: int, params: Optional[IdFilter] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        xq = np.ascontiguousarray(xq, dtype=np.float32)
+        nq = xq.shape[0]
+        distances = np.full((nq, k), np.inf, dtype=np.float32)
+        labels = np.full((nq, k), -1, dtype=np.int64)
+        if self.ntotal == 0:
+            return distances, labels
+        xq_norms = (xq * xq).sum(axis=1, keepdims=True)
+        rows = np.arange(nq)[:, None]
+        for start in range(0, self.ntotal, self.block_size):
+            end = min(start + self.block_size, self.ntotal)
+            block = np.asarray(self.vectors[start:end])
+            # ||x - y||^2 = ||x||^2 - 2 x·y + ||y||^2, 与 IndexFlatL2 一致
+            block_dist = xq_norms - 2 * (xq @ block.T) + self.norms[start:end][None, :]
+            block_jids = np.asarray(self.jids[start:end])
+            if params is not None:
+                block_dist[:, ~params.mask(block_jids)] = np.inf
+            block_labels = np.broadcast_to(block_jids, block_dist.shape)
+            cand_dist = np.hstack([distances, block_dist])
+            cand_labels = np.hstack([labels, block_labels])
+            top = np.argpartition(cand_dist, k - 1, axis=1)[:, :k]
+            distances = cand_dist[rows, top]
+            labels = cand_labels[rows, top]
+        order = np.argsort(distances, axis=1)
+        distances = np.maximum(distances[rows, order], 0)
+        labels = labels[rows, order]
+        labels[np.isinf(distances)] = -1
+        return distances, labels
+
+
+def _unwrap(index: faiss.Index) -> faiss.Index:
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def index_type_of(index) -> str:
+    if isinstance(index, MmapFlatIndex):
+        return "flat"
+    inner = _unwrap(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(inner, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def new_flat_index(dim: int) -> faiss.Index:
+    return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+
+def build_index(spec: IndexSpec, vectors: np.ndarray, jids: np.ndarray) -> faiss.Index:
+    """
+    按配置构建并训练索引, 向量 id 为 jid
+
+    IVF 系列原生支持 add_with_ids/remove_ids, 直接使用;
+    Flat / HNSW 外包一层 IndexIDMap2 维护 jid 映射
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    jids = np.ascontiguousarray(jids, dtype=np.int64)
+    ntotal, dim = vectors.shape
+    index_type = spec.effective_type(ntotal)
+
+    if index_type == "flat":
+        index = new_flat_index(dim)
+    elif index_type == "hnsw":
+        inner = faiss.IndexHNSWFlat(dim, spec.hnsw_m)
+        inner.hnsw.efConstruction = spec.ef_construction
+        index = faiss.IndexIDMap2(inner)
+    else:
+        nlist = spec.resolve_nlist(ntotal)
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_pq":
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, spec.resolve_pq_m(dim), spec.pq_nbits
+            )
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        # IndexIVF 不持有 quantizer 的 Python 引用, 需保证其生命周期
+        index.own_fields = True
+        quantizer.this.disown()
+        index.train(vectors)
+
+    if ntotal:
+        index.add_with_ids(vectors, jids)
+    return index
+
+
+def index_ids(index: faiss.Index) -> np.ndarray:
+    """
+    返回索引中全部 jid
+    """
+    if isinstance(index, MmapFlatIndex):
+        return np.array(index.jids, dtype=np.int64)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.vector_to_array(index.id_map).copy()
+    ivf = faiss.extract_index_ivf(index)
+    invlists = ivf.invlists
+    parts = []
+    for list_no in range(ivf.nlist):
+        size = invlists.list_size(list_no)
+        if size:
+            ids = faiss.rev_swig_ptr(invlists.get_ids(list_no), size)
+            parts.append(np.array(ids, dtype=np.int64))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def extract_vectors(index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    取出索引中的 (vectors, jids), 用于索引类型迁移
+    注意 IVF-PQ 为有损编码, 取出的是重建后的近似向量
+    """
+    if index.ntotal == 0:
+        return np.empty((0, index.d), dtype=np.float32), np.empty(0, dtype=np.int64)
+    if isinstance(index, MmapFlatIndex):
+        return np.array(index.vectors, dtype=np.float32), index_ids(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(index.index)
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+        return vectors, index_ids(index)
+    ivf = faiss.extract_index_ivf(index)
+    jids = index_ids(index)
+    ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+    try:
+        vectors = index.reconstruct_batch(jids)
+    finally:
+        ivf.set_direct_map_type(faiss.DirectMap.NoMap)
+    return vectors, jids
+
+
+def needs_rebuild(index, spec: IndexSpec, ntotal: Optional[int] = None) -> bool:
+    if index is None:
+        return False
+    ntotal = index.ntotal if ntotal is None else ntotal
+    return index_type_of(index) != spec.effective_type(ntotal)
+
+
+def save_base_index(index, path: str) -> None:
+    """
+    写入基线快照: Flat 存为可内存映射的原始 .npy, 其余类型使用 faiss.write_index
+    """
+    if index_type_of(index) == "flat":
+        vectors, jids = extract_vectors(index)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        np.save(os.path.join(path, FLAT_VECTORS_FILE), vectors)
+        np.save(os.path.join(path, FLAT_NORMS_FILE), (vectors * vectors).sum(axis=1))
+        np.save(os.path.join(path, FLAT_JIDS_FILE), jids.astype(np.int64))
+    else:
+        faiss.write_index(index, os.path.join(path, INDEX_FILE))
+
+
+def load_base_index(path: str, mmap: bool = True):
+    """
+    读取基线快照, mmap=True 时以只读内存映射方式加载:
+    Flat 使用 MmapFlatIndex, IVF 的倒排表通过 IO_FLAG_MMAP 映射;
+    HNSW 的图结构无法映射, 仍整体读入内存
+    """
+    if os.path.exists(os.path.join(path, FLAT_VECTORS_FILE)):
+        if mmap:
+            return MmapFlatIndex(path)
+        vectors = np.load(os.path.join(path, FLAT_VECTORS_FILE))
+        jids = np.load(os.path.join(path, FLAT_JIDS_FILE))
+        index = new_flat_index(vectors.shape[1])
+        if len(jids):
+            index.add_with_ids(vectors, jids)
+        return index
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    return faiss.read_index(os.path.join(path, INDEX_FILE), flags)
+
+
+def merge_into_base(
+    base,
+    base_path: Optional[str],
+    vectors: np.ndarray,
+    jids: np.ndarray,
+    removed: Optional[np.ndarray] = None,
+):
+    """
+    从基线中移除 removed 并追加增量向量, 返回新的可写索引(不修改传入的只读基线)
+    HNSW 不支持删除, 有 removed 时需由调用方走重建流程
+    """
+    has_removed = removed is not None and len(removed) > 0
+    if base is None:
+        index = new_flat_index(vectors.shape[1])
+    elif index_type_of(base) == "flat":
+        base_vectors, base_jids = extract_vectors(base)
+        if has_removed:
+            keep = ~np.isin(base_jids, removed)
+            base_vectors, base_jids = base_vectors[keep], base_jids[keep]
+        index = new_flat_index(base.d)
+        if len(base_jids):
+            index.add_with_ids(base_vectors, base_jids)
+    else:
+        # 只读映射的基线不能追加, 重新读入一份私有副本
+        index = faiss.read_index(os.path.join(base_path, INDEX_FILE))
+        if has_removed:
+            index.remove_ids(faiss.IDSelectorBatch(np.asarray(removed, dtype=np.int64)))
+    if len(jids):
+        index.add_with_ids(
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            np.ascontiguousarray(jids, dtype=np.int64),
+        )
+    return index
+
+
+def remove_ids(index: faiss.Index, jids: np.ndarray) -> int:
+    if index is None or len(jids) == 0:
+        return 0
+    return index.remove_ids(faiss.IDSelectorBatch(np.asarray(jids, dtype=np.int64)))
+
+
+def search_tiers(
+    tiers, xq: np.ndarray, k: int, params_fn
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    依次检索基线与增量等多层索引, 按距离合并出每个查询的 top-k
+    """
+    results = [
+        tier.search(xq, k, params=params_fn(tier))
+        for tier in tiers
+        if tier is not None and tier.ntotal > 0
+    ]
+    if not results:
+        nq = xq.shape[0]
+        return (
+            np.full((nq, k), np.inf, dtype=np.float32),
+            np.full((nq, k), -1, dtype=np.int64),
+        )
+    if len(results) == 1:
+        return results[0]
+    distances = np.hstack([d for d, _ in results])
+    labels = np.hstack([i for _, i in results])
+    # 无效结果(-1)排到最后
+    distances = np.where(labels == -1, np.inf, distances)
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    rows = np.arange(xq.shape[0])[:, None]
+    return distances[rows, order], labels[rows, order]
+
+
+def make_search_params(
+    index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    id_filter: Optional[IdFilter] = None,
+):
+    """
+    按索引类型构造单次检索参数, 避免修改索引上的全局状态
+
+    带白名单过滤时按选择率放大 nprobe / efSearch:
+    只有 include 占比的候选满足条件, 探测范围放大 ntotal / len(include) 倍后,
+    满足条件的候选数与不过滤时相当, 过滤在 ANN 内部完成而不是事后丢弃
+    """
+    if isinstance(index, MmapFlatIndex):
+        return id_filter
+    index_type = index_type_of(index)
+    kwargs = {}
+    boost = 1.0
+    if id_filter is not None:
+        kwargs["sel"] = id_filter.selector()
+        if id_filter.include is not None and index.ntotal:
+            boost = max(1.0, index.ntotal / max(len(id_filter.include), 1))
+    if index_type in ("ivf_flat", "ivf_pq"):
+        if nprobe:
+            nlist = faiss.extract_index_ivf(index).nlist
+            kwargs["nprobe"] = min(nlist, math.ceil(nprobe * boost))
+        return faiss.SearchParametersIVF(**kwargs) if kwargs else None
+    if index_type == "hnsw":
+        if ef_search:
+            kwargs["efSearch"] = min(
+                max(index.ntotal, ef_search), math.ceil(ef_search * boost)
+            )
+        return faiss.SearchParametersHNSW(**kwargs) if kwargs else None
+    return faiss.SearchParameters(**kwargs) if kwargs else None
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:06:42
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : index_leader.py
+# @License : Apache-2.0
+# @Desc    : 多 worker 下的向量索引单写入者协调(选主 + 版本发布 + 写操作转发)
+
+import os
+import uuid
+import socket
+from typing import List, Optional
+
+from services.telemetry import capture_exception
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 仍由自己持有时才续期/释放, 避免误删其它进程在租约过期后拿到的锁
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaderLock:
+    """
+    基于 Redis 租约的写入者锁: SET NX PX 抢占, 持有者定期续期,
+    进程异常退出后租约到期即可由其它 worker 接管, 适用于多机部署
+    """
+
+    def __init__(self, redis_client, key: str, ttl: float = 15):
+        self.redis = redis_client
+        self.key = key
+        self.ttl_ms = int(ttl * 1000)
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self.held = False
+
+    async def acquire(self) -> bool:
+        """
+        未持有时尝试抢占, 已持有时续期; 返回调用后是否持有
+        """
+        try:
+            if self.held:
+                renewed = await self.redis.eval(
+                    _RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms
+                )
+                self.held = bool(renewed)
+            else:
+                self.held = bool(
+                    await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms)
+                )
+        except Exception:
+            # 无法确认租约仍然有效, 立即停止写入
+            self.held = False
+            raise
+        return self.held
+
+    async def release(self) -> None:
+        if not self.held:
+            return
+        self.held = False
+        await self.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+
+
+class FileLeaderLock:
+    """
+    基于文件锁的写入者锁, 适用于单机多 worker; 进程退出时由操作系统释放, 无需租约
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    async def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def release(self) -> None:
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+class IndexCoordinator:
+    """
+    同一时刻只有持有写入者锁的 worker(leader) 做 embedding 与索引写入:
+        leader 每次写入增量段或切换基线后发布新的版本号
+        其它 worker(follower) 发现版本号变化后从共享的索引目录重新加载/映射快照
+        follower 上的岗位变更通过 Redis 列表转发给 leader 执行
+
+    版本号与转发队列固定使用 Redis(会话、缓存等已依赖 Redis), 选主可选 Redis 或文件锁;
+    多机部署时索引目录需位于共享存储上
+    """
+
+    def __init__(self, lock, redis_client, namespace: str = "job_index"):
+        self.lock = lock
+        self.redis = redis_client
+        self.version_key = f"{namespace}:version"
+        self.ops_key = f"{namespace}:ops"
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.held
+
+    async def elect(self) -> bool:
+        """
+        抢占或续期写入者锁, 返回当前是否为 leader; 访问锁失败时视为失去写入权
+        """
+        try:
+            return await self.lock.acquire()
+        except Exception as e:
+            capture_exception(e)
+            return self.lock.held
+
+    async def resign(self) -> None:
+        try:
+            await self.lock.release()
+        except Exception as e:
+            capture_exception(e)
+
+    async def publish(self, version: str) -> None:
+        try:
+            await self.redis.set(self.version_key, version)
+        except Exception as e:
+            capture_exception(e)
+
+    async def current_version(self) -> Optional[str]:
+        try:
+            return await self.redis.get(self.version_key)
+        except Exception as e:
+            capture_exception(e)
+            return None
+
+    async def forward(self, items: List[str]) -> None:
+        if items:
+            await self.redis.rpush(self.ops_key, *items)
+
+    async def receive(self, max_items: int, timeout: float = 1) -> List[str]:
+        """
+        阻塞等待转发来的写操作, 一次最多取 max_items 条; 超时返回空列表
+        """
+        first = await self.redis.blpop([self.ops_key], timeout=timeout)
+        if first is None:
+            return []
+        items = [first[1]]
+        if max_items > 1:
+            items.extend(await self.redis.lpop(self.ops_key, max_items - 1) or [])
+        return items
+
+
+def make_index_coordinator(
+    backend: str, redis_client, index_dir: str, ttl: float
+) -> Optional[IndexCoordinator]:
+    """
+    backend: redis / file / none, none 表示每个进程各自写入(仅适用于单 worker)
+    """
+    if backend == "none":
+        return None
+    if backend == "redis":
+        lock = RedisLeaderLock(redis_client, "job_index:leader", ttl)
+    elif backend == "file":
+        lock = FileLeaderLock(os.path.join(index_dir, ".writer.lock"))
+    else:
+        raise ValueError(f"unknown index leader backend: {backend}")
+    return IndexCoordinator(lock, redis_client)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:32:10
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : index_snapshot.py
+# @License : Apache-2.0
+# @Desc    : 不可变的向量索引快照(分层 + 版本号), 写入生成新快照后整体替换引用
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .index_factory import IdFilter, extract_vectors, index_ids, new_flat_index
+
+_EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+
+@dataclass(frozen=True, eq=False)
+class IndexTier:
+    """
+    快照中的一层索引, 发布后不再修改
+
+    Attributes:
+        index: FAISS 索引或 MmapFlatIndex
+        jids: 本层全部 jid(有序)
+        exclude: 已被更新层覆盖或已删除的 jid(有序), 检索时过滤
+        path: 已落盘基线的目录, 增量层为 None
+    """
+
+    index: object
+    jids: np.ndarray
+    exclude: np.ndarray = field(default_factory=lambda: _EMPTY_IDS)
+    path: Optional[str] = None
+    id_filter: Optional[IdFilter] = None
+
+    @classmethod
+    def of(cls, index, path: Optional[str] = None) -> "IndexTier":
+        return cls(index=index, jids=np.sort(index_ids(index)), path=path)
+
+    @property
+    def live(self) -> int:
+        return len(self.jids) - len(self.exclude)
+
+    def live_jids(self) -> np.ndarray:
+        return np.setdiff1d(self.jids, self.exclude, assume_unique=True)
+
+    def superseded(self, touched: np.ndarray) -> "IndexTier":
+        """
+        返回将 touched 中属于本层的 jid 标记为失效后的新层, 无变化时返回自身
+        """
+        hit = touched[np.isin(touched, self.jids, assume_unique=True)]
+        if len(hit) == 0:
+            return self
+        exclude = np.union1d(self.exclude, hit)
+        if len(exclude) == len(self.exclude):
+            return self
+        return IndexTier(
+            index=self.index,
+            jids=self.jids,
+            exclude=exclude,
+            path=self.path,
+            id_filter=IdFilter(exclude=exclude),
+        )
+
+    def search_filter(self, include: Optional[np.ndarray] = None) -> Optional[IdFilter]:
+        if include is None:
+            return self.id_filter
+        if len(self.exclude):
+            include = np.setdiff1d(include, self.exclude, assume_unique=True)
+        return IdFilter(include=include)
+
+    def live_vectors(self, source=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        取出本层有效的 (vectors, jids), source 为可写的私有副本(如 IVF 基线), 默认读取 index
+        """
+        vectors, jids = extract_vectors(self.index if source is None else source)
+        if len(self.exclude):
+            keep = ~np.isin(jids, self.exclude)
+            vectors, jids = vectors[keep], jids[keep]
+        return vectors, jids
+
+
+@dataclass(frozen=True, eq=False)
+class IndexSnapshot:
+    """
+    tiers 从旧到新排列, 首层可能是已落盘的基线(path 非空), 其后为进程内增量层;
+    同一 jid 只在最新写入的层中有效, 旧层中的副本通过 exclude 过滤
+    """
+
+    version: int
+    seq: int = 0  # 已包含的最大增量段序号
+    tiers: Tuple[IndexTier, ...] = ()
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def base(self) -> Optional[IndexTier]:
+        if self.tiers and self.tiers[0].path is not None:
+            return self.tiers[0]
+        return None
+
+    @property
+    def deltas(self) -> Tuple[IndexTier, ...]:
+        return self.tiers[1:] if self.base is not None else self.tiers
+
+    @property
+    def ntotal(self) -> int:
+        return sum(t.live for t in self.tiers)
+
+    @property
+    def dim(self) -> int:
+        return self.tiers[0].index.d if self.tiers else 0
+
+    def live_jids(self) -> np.ndarray:
+        parts = [t.live_jids() for t in self.tiers]
+        return np.concatenate(parts) if parts else _EMPTY_IDS
+
+    def apply(
+        self,
+        version: int,
+        seq: int,
+        vectors: np.ndarray,
+        jids: np.ndarray,
+        deleted: np.ndarray,
+    ) -> "IndexSnapshot":
+        """
+        返回写入一个增量段后的新快照: 旧层中被更新/删除的 jid 标记失效, 新向量作为新的一层
+        """
+        touched = np.union1d(jids, deleted).astype(np.int64)
+        tiers = [t.superseded(touched) for t in self.tiers]
+        if len(jids):
+            index = new_flat_index(vectors.shape[1])
+            index.add_with_ids(
+                np.ascontiguousarray(vectors, dtype=np.float32),
+                np.ascontiguousarray(jids, dtype=np.int64),
+            )
+            tiers.append(IndexTier.of(index))
+        return IndexSnapshot(version=version, seq=max(self.seq, seq), tiers=tuple(tiers))
+
+    def merge_deltas(self, version: int) -> "IndexSnapshot":
+        """
+        将全部增量层合并为一层 Flat, 控制检索时需要遍历的层数
+        """
+        deltas = self.deltas
+        if len(deltas) < 2:
+            return self
+        parts = [t.live_vectors() for t in deltas]
+        index = new_flat_index(self.dim)
+        jids = np.concatenate([j for _, j in parts])
+        if len(jids):
+            index.add_with_ids(np.vstack([v for v, _ in parts]), jids)
+        tiers = ((self.base,) if self.base is not None else ()) + (IndexTier.of(index),)
+        return IndexSnapshot(version=version, seq=self.seq, tiers=tiers)
+
+    def replace(
+        self, since: "IndexSnapshot", tiers: Tuple[IndexTier, ...], version: int
+    ) -> "IndexSnapshot":
+        """
+        用内容与 since 等价的新分层(compaction 生成的新基线, 或回滚时的旧分层)
+        替换当前快照中来自 since 的层, 并把 since 之后的更新/删除重新作用到新分层上
+        since 必须是当前快照的祖先, 且期间没有合并过增量层
+        """
+        since_tiers = {id(t.index): t for t in since.tiers}
+        touched_parts = [_EMPTY_IDS]
+        newer = []
+        for tier in self.tiers:
+            old = since_tiers.get(id(tier.index))
+            if old is None:
+                newer.append(tier)
+                touched_parts.append(tier.jids)
+            else:
+                touched_parts.append(
+                    np.setdiff1d(tier.exclude, old.exclude, assume_unique=True)
+                )
+        touched = np.unique(np.concatenate(touched_parts))
+        replaced = tuple(t.superseded(touched) for t in tiers)
+        return IndexSnapshot(version=version, seq=self.seq, tiers=replaced + tuple(newer))
+
+    def describe(self) -> dict:
+        base = self.base
+        return {
+            "version": self.version,
+            "seq": self.seq,
+            "ntotal": self.ntotal,
+            "tiers": len(self.tiers),
+            "base": base.path if base is not None else None,
+            "created_at": self.created_at,
+        }
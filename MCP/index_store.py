@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:48:20
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : index_store.py
+# @License : Apache-2.0
+# @Desc    : 向量索引持久化(基线快照 + 追加写增量段)
+
+import os
+import json
+import shutil
+import threading
+from contextlib import suppress
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+DELTA_DIR = "deltas"
+
+
+def _fsync_dir(path: str) -> None:
+    # Windows 不支持对目录 fsync
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write_bytes(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SegmentedIndexStore:
+    """
+    目录结构:
+        index_dir/
+            manifest.json          {"base": "base-00000003", "generation": 3, "base_seq": 12, "next_seq": 15}
+            base-00000003/         基线快照, 由调用方负责写入/读取具体格式
+            deltas/
+                delta-00000013.npz 增量段 (vectors: float32[n, d], jids: int64[n], deleted: int64[m])
+                delta-00000014.npz
+
+    每个写入批次只追加一个增量段, 写放大为 O(batch);
+    启动时读取基线并按序回放 base_seq 之后的增量段;
+    compact 将当前内存索引落为新基线后再清理已折叠的增量段。
+    """
+
+    def __init__(self, index_dir: str, keep_bases: int = 0):
+        """
+        Args:
+            index_dir (str): 索引目录
+            keep_bases (int): 切换基线后保留的旧基线个数, 供快照回滚
+        """
+        self.index_dir = index_dir
+        self.keep_bases = max(0, int(keep_bases))
+        self.delta_dir = os.path.join(index_dir, DELTA_DIR)
+        os.makedirs(self.delta_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        path = os.path.join(self.index_dir, MANIFEST_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("base", None)
+        manifest.setdefault("base_seq", 0)
+        manifest.setdefault("next_seq", manifest["base_seq"] + 1)
+        # 增量段可能在 manifest 落盘后继续追加, 以磁盘为准
+        for seq, _ in self._list_deltas():
+            manifest["next_seq"] = max(manifest["next_seq"], seq + 1)
+        return manifest
+
+    def _write_manifest(self) -> None:
+        data = json.dumps(self.manifest, ensure_ascii=False).encode("utf-8")
+        _atomic_write_bytes(os.path.join(self.index_dir, MANIFEST_FILE), data)
+        _fsync_dir(self.index_dir)
+
+    def _list_deltas(self) -> List[Tuple[int, str]]:
+        out: List[Tuple[int, str]] = []
+        for name in os.listdir(self.delta_dir):
+            if not (name.startswith("delta-") and name.endswith(".npz")):
+                continue
+            try:
+                seq = int(name[len("delta-") : -len(".npz")])
+            except ValueError:
+                continue
+            out.append((seq, os.path.join(self.delta_dir, name)))
+        return sorted(out)
+
+    @property
+    def base_path(self) -> Optional[str]:
+        if base := self.manifest.get("base"):
+            return os.path.join(self.index_dir, base)
+        return None
+
+    @property
+    def last_seq(self) -> int:
+        return self.manifest["next_seq"] - 1
+
+    def pending_deltas(self, after: Optional[int] = None) -> List[Tuple[int, str]]:
+        if after is None:
+            after = self.manifest["base_seq"]
+        return [d for d in self._list_deltas() if d[0] > after]
+
+    def refresh(self) -> None:
+        """
+        重新读取其它进程写入的 manifest 与增量段, 用于 follower 跟随以及接管写入前对齐序号
+        """
+        manifest = self._read_manifest()
+        with self._lock:
+            self.manifest = manifest
+
+    def update_meta(self, **values) -> None:
+        """
+        更新 manifest 中的附加字段(如同步水位)并落盘
+        """
+        with self._lock:
+            self.manifest.update(values)
+            self._write_manifest()
+
+    def append_delta(
+        self,
+        vectors: np.ndarray,
+        jids: np.ndarray,
+        deleted: Optional[np.ndarray] = None,
+    ) -> int:
+        """
+        追加一个增量段, 返回其序号
+        回放时先删除 deleted 中的 jid, 再写入 vectors/jids
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        jids = np.ascontiguousarray(jids, dtype=np.int64)
+        if deleted is None:
+            deleted = np.empty(0, dtype=np.int64)
+        deleted = np.ascontiguousarray(deleted, dtype=np.int64)
+        with self._lock:
+            seq = self.manifest["next_seq"]
+            self.manifest["next_seq"] = seq + 1
+        self._write_delta(seq, vectors, jids, deleted)
+        return seq
+
+    def _write_delta(
+        self, seq: int, vectors: np.ndarray, jids: np.ndarray, deleted: np.ndarray
+    ) -> None:
+        path = os.path.join(self.delta_dir, f"delta-{seq:08d}.npz")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                vectors=np.ascontiguousarray(vectors, dtype=np.float32),
+                jids=np.ascontiguousarray(jids, dtype=np.int64),
+                deleted=np.ascontiguousarray(deleted, dtype=np.int64),
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def iter_deltas(
+        self, after: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        按序回放基线(或 after 序号)之后的增量段, 损坏的尾部段(写入中断)直接跳过
+        """
+        for seq, path in self.pending_deltas(after):
+            try:
+                with np.load(path) as data:
+                    deleted = (
+                        data["deleted"]
+                        if "deleted" in data.files
+                        else np.empty(0, dtype=np.int64)
+                    )
+                    yield seq, data["vectors"], data["jids"], deleted
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def commit_base(self, seq: int, save_fn: Callable[[str], None]) -> None:
+        """
+        写入新基线并原子切换 manifest, 随后清理旧基线和已折叠的增量段
+
+        Args:
+            seq (int): 新基线已包含的最大增量段序号
+            save_fn (Callable[[str], None]): 将索引写入给定目录的函数
+        """
+        generation = self.manifest.get("generation", 0) + 1
+        name = f"base-{generation:08d}"
+        path = os.path.join(self.index_dir, name)
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.manifest["base"] = name
+            self.manifest["base_seq"] = max(seq, self.manifest["base_seq"])
+            self.manifest["generation"] = generation
+            self._write_manifest()
+
+        # 旧基线可能仍被进行中的检索 mmap 使用, POSIX 下删除目录不影响已映射的文件
+        old_bases = sorted(
+            entry
+            for entry in os.listdir(self.index_dir)
+            if entry.startswith("base-") and entry != name and not entry.endswith(".tmp")
+        )
+        for entry in old_bases[: max(0, len(old_bases) - self.keep_bases)]:
+            shutil.rmtree(os.path.join(self.index_dir, entry), ignore_errors=True)
+        for delta_seq, delta_path in self._list_deltas():
+            if delta_seq <= seq:
+                with suppress(OSError):
+                    os.remove(delta_path)
+
+    def rollback_base(
+        self,
+        base: Optional[str],
+        seq: int,
+        vectors: np.ndarray,
+        jids: np.ndarray,
+        deleted: np.ndarray,
+    ) -> None:
+        """
+        把 manifest 切回保留的旧基线, 并删除被回滚的当前基线
+
+        旧基线之后、已折叠进当前基线的增量段在 commit_base 时已被清理, 由调用方把这部分内容
+        (旧基线上的失效 jid 与增量层的有效向量)合并传入, 写为序号 seq 的单个增量段;
+        seq 为当前基线已包含的最大序号, 其后的增量段保持不变, 回放时叠加在其上
+
+        Args:
+            base (Optional[str]): 旧基线目录名(base-*), None 表示回滚到没有基线的状态
+            seq (int): 当前基线的 base_seq
+        """
+        if base is not None and not os.path.isdir(os.path.join(self.index_dir, base)):
+            raise FileNotFoundError(f"retained base not found: {base}")
+        if len(jids) or len(deleted):
+            self._write_delta(seq, vectors, jids, deleted)
+            base_seq = seq - 1
+        else:
+            base_seq = seq
+        with self._lock:
+            current = self.manifest.get("base")
+            self.manifest["base"] = base
+            self.manifest["base_seq"] = base_seq
+            # 版本号随 generation 变化, follower 据此整体重新加载
+            self.manifest["generation"] = self.manifest.get("generation", 0) + 1
+            self._write_manifest()
+        if current and current != base:
+            shutil.rmtree(os.path.join(self.index_dir, current), ignore_errors=True)
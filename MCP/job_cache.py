@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:05:19
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : job_cache.py
+# @License : Apache-2.0
+# @Desc    : 岗位检索结果回填缓存(进程内 LRU + 可选 Redis 哈希)
+
+import os
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.telemetry import capture_exception
+
+Payload = Dict[str, object]
+
+
+class JobPayloadCache:
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 300,
+        redis_client=None,
+        redis_ttl: int = 86400,
+        recent_size: int = 1000,
+        namespace: str = "job_payload",
+    ):
+        """
+        Args:
+            max_size (int): 进程内最多缓存的岗位数, <=0 关闭进程内缓存
+            ttl (float): 进程内缓存有效期(秒), 其它 worker 的更新只能靠过期感知, 不宜过长
+            redis_client: 文本 Redis 客户端(decode_responses=True), 为 None 时不跨进程共享
+            redis_ttl (int): Redis 哈希整体过期时间(秒), 兜底绕过 ORM 事件的批量更新
+            recent_size (int): 记录最近返回的岗位数, 用于启动预热
+            namespace (str): Redis 键前缀
+        """
+        self.max_size = int(max_size)
+        self.ttl = float(ttl)
+        self.redis = redis_client
+        self.redis_ttl = int(redis_ttl)
+        self.recent_size = int(recent_size)
+        self.hash_key = namespace
+        self.recent_key = f"{namespace}:recent"
+        self._data: "OrderedDict[int, Tuple[float, Payload]]" = OrderedDict()
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _get_local(self, jid: int) -> Optional[Payload]:
+        item = self._data.get(jid)
+        if item is None:
+            return None
+        expire_at, payload = item
+        if expire_at and expire_at < time.monotonic():
+            self._data.pop(jid, None)
+            return None
+        self._data.move_to_end(jid)
+        return payload
+
+    def _put_local(self, jid: int, payload: Payload) -> None:
+        if self.max_size <= 0:
+            return
+        expire_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        self._data[jid] = (expire_at, payload)
+        self._data.move_to_end(jid)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def _touch(self, jids: Iterable[int]) -> None:
+        for jid in jids:
+            self._recent[jid] = None
+            self._recent.move_to_end(jid)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    async def get_many(self, jids: List[int]) -> Dict[int, Payload]:
+        """
+        读取岗位数据, 只返回命中的部分, 未命中的由调用方查库后 put_many 回填
+        """
+        found: Dict[int, Payload] = {}
+        remote: List[int] = []
+        for jid in jids:
+            if (payload := self._get_local(jid)) is not None:
+                found[jid] = payload
+            else:
+                remote.append(jid)
+        self.hits += len(found)
+        self._touch(jids)
+        if self.redis is None:
+            self.misses += len(remote)
+            return found
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if remote:
+                pipe.hmget(self.hash_key, [str(jid) for jid in remote])
+            now = time.time()
+            pipe.zadd(self.recent_key, {str(jid): now for jid in jids})
+            pipe.zremrangebyrank(self.recent_key, 0, -self.recent_size - 1)
+            results = await pipe.execute()
+        except Exception as e:
+            capture_exception(e)
+            self.misses += len(remote)
+            return found
+        if remote:
+            for jid, raw in zip(remote, results[0]):
+                if raw:
+                    payload = json.loads(raw)
+                    found[jid] = payload
+                    self._put_local(jid, payload)
+                    self.redis_hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    async def put_many(self, payloads: Dict[int, Payload]) -> None:
+        for jid, payload in payloads.items():
+            self._put_local(jid, payload)
+        if self.redis is None or not payloads:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(
+                self.hash_key,
+                mapping={
+                    str(jid): json.dumps(payload, ensure_ascii=False)
+                    for jid, payload in payloads.items()
+                },
+            )
+            if self.redis_ttl > 0:
+                pipe.expire(self.hash_key, self.redis_ttl, nx=True)
+            await pipe.execute()
+        except Exception as e:
+            capture_exception(e)
+
+    def invalidate_local(self, jids: Iterable[int]) -> None:
+        for jid in jids:
+            self._data.pop(int(jid), None)
+
+    async def invalidate(self, jids: Iterable[int]) -> None:
+        jids = [int(jid) for jid in jids]
+        self.invalidate_local(jids)
+        if self.redis is None or not jids:
+            return
+        try:
+            await self.redis.hdel(self.hash_key, *[str(jid) for jid in jids])
+        except Exception as e:
+            capture_exception(e)
+
+    async def recent_jids(self, path: Optional[str] = None) -> List[int]:
+        """
+        最近返回过的岗位, 优先取 Redis 中各 worker 共享的记录, 否则读本地文件
+        """
+        if self.redis is not None:
+            try:
+                raw = await self.redis.zrevrange(self.recent_key, 0, self.recent_size - 1)
+                return [int(jid) for jid in raw]
+            except Exception as e:
+                capture_exception(e)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return [int(jid) for jid in json.load(f)][-self.recent_size :]
+            except (OSError, ValueError, TypeError):
+                return []
+        return []
+
+    def save_recent(self, path: str) -> None:
+        # 多个 worker 可能同时退出, 临时文件按进程区分
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._recent), f)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / total if total else 0.0,
+        }
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 14:26:08
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : lexical_index.py
+# @License : Apache-2.0
+# @Desc    : 进程内倒排索引(字符 n-gram + BM25)及 RRF 融合
+
+import re
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .query_cache import normalize_query
+
+# 英文/数字词(保留 c++、c#、node.js 等写法)与连续汉字
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*|[\u3400-\u9fff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    中文按字符二元组切分(单字保留一元), 英文/数字按整词切分
+    例: "3年React前端开发 上海" -> ["3", "年", "react", "前端", "端开", "开发", "上海"]
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(normalize_query(text)):
+        token = match.group()
+        if token[0].isascii():
+            tokens.append(token.rstrip("."))
+        elif len(token) == 1:
+            tokens.append(token)
+        else:
+            tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Tuple[int, float]]], k: int = 60
+) -> List[Tuple[int, float]]:
+    """
+    倒数排名融合: score(d) = Σ 1 / (k + rank_i(d)), rank 从 1 开始
+    只使用名次, 不要求各路分数同量纲(L2 距离与 BM25 可直接融合)
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (jid, _) in enumerate(ranking, start=1):
+            fused[jid] = fused.get(jid, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class _GrowableArray:
+    def __init__(self, dtype):
+        self.data = np.empty(1024, dtype=dtype)
+        self.size = 0
+
+    def append(self, value) -> None:
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, len(self.data) * 2)
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+    def reset(self, values: np.ndarray) -> None:
+        self.data = np.array(values, dtype=self.data.dtype)
+        if len(self.data) == 0:
+            self.data = np.empty(1024, dtype=self.data.dtype)
+        self.size = len(values)
+
+
+class LexicalIndex:
+    """
+    BM25 倒排索引, 文档以内部序号 doc 存储, 对外以 jid 标识
+
+    倒排表分为三部分:
+        冻结段: CSR 结构, offsets[t]:offsets[t+1] 为词项 t 的 (doc int32, tf uint16)
+        合并段: 正在后台合并进冻结段的尾部段, 合并完成前仍参与检索
+        尾部段: 新写入的文档, 以 dict 形式追加, 超过阈值后与冻结段合并
+    更新即旧文档标记删除 + 追加新文档, 合并时剔除已删除文档并重排序号;
+    合并在锁外构建新的倒排表, 只在替换时短暂持锁, 检索也只在锁内收集倒排表引用
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, merge_threshold: int = 4096):
+        self.k1 = float(k1)
+        self.b = float(b)
+        self.merge_threshold = int(merge_threshold)
+        self._lock = threading.Lock()
+        self.ready = False
+        self._term_ids: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._post_docs = np.empty(0, dtype=np.int32)
+        self._post_tfs = np.empty(0, dtype=np.uint16)
+        self._tail: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._tail_docs = 0
+        self._merging: Optional[Dict[int, Tuple[List[int], List[int]]]] = None
+        self._jids = _GrowableArray(np.int64)
+        self._lengths = _GrowableArray(np.float32)
+        self._alive = _GrowableArray(np.bool_)
+        self._doc_of: Dict[int, int] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def __contains__(self, jid: int) -> bool:
+        return jid in self._doc_of
+
+    def _remove_locked(self, jid: int) -> None:
+        doc = self._doc_of.pop(jid, None)
+        if doc is None:
+            return
+        self._alive.data[doc] = False
+        self._total_length -= float(self._lengths.data[doc])
+
+    def _add_locked(self, jid: int, text: str) -> None:
+        self._remove_locked(jid)
+        counts = Counter(tokenize(text))
+        doc = self._jids.size
+        self._jids.append(jid)
+        length = sum(counts.values())
+        self._lengths.append(length)
+        self._alive.append(True)
+        self._doc_of[jid] = doc
+        self._total_length += length
+        for term, tf in counts.items():
+            term_id = self._term_ids.setdefault(term, len(self._term_ids))
+            docs, tfs = self._tail.setdefault(term_id, ([], []))
+            docs.append(doc)
+            tfs.append(min(tf, 65535))
+        self._tail_docs += 1
+
+    def update(
+        self,
+        items: Iterable[Tuple[int, str]],
+        removed: Iterable[int] = (),
+        only_missing: bool = False,
+    ) -> None:
+        """
+        写入/替换文档并删除 removed 中的 jid, 尾部段超过阈值时在当前线程合并(不阻塞检索)
+
+        Args:
+            items (Iterable[Tuple[int, str]]): (jid, 文本)
+            removed (Iterable[int]): 需要删除的 jid
+            only_missing (bool): 仅写入尚未收录的 jid, 用于启动时全量构建,
+                避免覆盖构建期间实时写入的新文本
+        """
+        with self._lock:
+            for jid in removed:
+                self._remove_locked(int(jid))
+            for jid, text in items:
+                if only_missing and jid in self._doc_of:
+                    continue
+                self._add_locked(int(jid), text or "")
+            frozen_docs = self._jids.size - self._tail_docs
+            if self._merging is not None or self._tail_docs < max(
+                self.merge_threshold, frozen_docs // 10
+            ):
+                return
+            # 封存尾部段, 之后的写入进入新的尾部段; 冻结段数组只整体替换不原地修改, 可直接引用
+            self._merging, sealed_docs = self._tail, self._tail_docs
+            self._tail, self._tail_docs = {}, 0
+            sealed = (
+                self._merging,
+                self._offsets,
+                self._post_docs,
+                self._post_tfs,
+                self._alive.view().copy(),
+                self._jids.view().copy(),
+                len(self._term_ids),
+            )
+        try:
+            merged = self._build_merged(*sealed)
+        except BaseException:
+            with self._lock:
+                self._restore_sealed_locked(sealed_docs)
+            raise
+        with self._lock:
+            self._swap_merged_locked(*merged)
+
+    @staticmethod
+    def _build_merged(
+        sealed: Dict[int, Tuple[List[int], List[int]]],
+        offsets: np.ndarray,
+        post_docs: np.ndarray,
+        post_tfs: np.ndarray,
+        alive: np.ndarray,
+        jids: np.ndarray,
+        n_terms: int,
+    ):
+        """
+        在锁外展开冻结段与封存的尾部段为 (term, doc, tf) 三元组, 剔除封存时已删除的文档后重新排序
+        """
+        frozen_terms = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        terms = [frozen_terms]
+        docs = [post_docs.astype(np.int64)]
+        tfs = [post_tfs]
+        for term_id, (tail_docs, tail_tfs) in sealed.items():
+            terms.append(np.full(len(tail_docs), term_id, dtype=np.int64))
+            docs.append(np.asarray(tail_docs, dtype=np.int64))
+            tfs.append(np.asarray(tail_tfs, dtype=np.uint16))
+        terms = np.concatenate(terms)
+        docs = np.concatenate(docs)
+        tfs = np.concatenate(tfs)
+
+        keep = alive[docs]
+        terms, docs, tfs = terms[keep], docs[keep], tfs[keep]
+        remap = np.cumsum(alive) - 1
+        docs = remap[docs]
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        counts = np.bincount(terms, minlength=n_terms)
+        new_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        doc_of = {int(jid): doc for doc, jid in enumerate(jids[alive].tolist())}
+        return new_offsets, docs.astype(np.int32), tfs, alive, remap, doc_of
+
+    def _swap_merged_locked(
+        self,
+        offsets: np.ndarray,
+        post_docs: np.ndarray,
+        post_tfs: np.ndarray,
+        alive_sealed: np.ndarray,
+        remap: np.ndarray,
+        doc_of: Dict[int, int],
+    ) -> None:
+        """
+        替换为合并后的倒排表, 并补上合并期间的写入: 封存后删除的旧文档从 doc_of 中去掉,
+        封存后追加的文档(尾部段)整体前移 shift 个序号
+        """
+        upto = len(alive_sealed)
+        shift = upto - int(alive_sealed.sum())
+        jids, lengths, alive = self._jids.view(), self._lengths.view(), self._alive.view()
+        for doc in np.flatnonzero(alive_sealed & ~alive[:upto]).tolist():
+            jid = int(jids[doc])
+            if doc_of.get(jid) == remap[doc]:
+                del doc_of[jid]
+        for doc in np.flatnonzero(alive[upto:]).tolist():
+            doc_of[int(jids[upto + doc])] = upto + doc - shift
+        if shift:
+            for tail_docs, _ in self._tail.values():
+                tail_docs[:] = [doc - shift for doc in tail_docs]
+
+        self._offsets, self._post_docs, self._post_tfs = offsets, post_docs, post_tfs
+        self._jids.reset(np.concatenate([jids[:upto][alive_sealed], jids[upto:]]))
+        self._lengths.reset(np.concatenate([lengths[:upto][alive_sealed], lengths[upto:]]))
+        self._alive.reset(np.concatenate([alive[:upto][alive_sealed], alive[upto:]]))
+        self._doc_of = doc_of
+        self._merging = None
+
+    def _restore_sealed_locked(self, sealed_docs: int) -> None:
+        # 合并失败时把封存段放回尾部段, 序号未变, 词项内顺序不影响检索
+        sealed, self._merging = self._merging, None
+        for term_id, (docs, tfs) in sealed.items():
+            tail_docs, tail_tfs = self._tail.setdefault(term_id, ([], []))
+            tail_docs.extend(docs)
+            tail_tfs.extend(tfs)
+        self._tail_docs += sealed_docs
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        parts_docs: List[np.ndarray] = []
+        parts_tfs: List[np.ndarray] = []
+        if term_id < len(self._offsets) - 1:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            parts_docs.append(self._post_docs[start:end])
+            parts_tfs.append(self._post_tfs[start:end])
+        for segment in (self._merging, self._tail):
+            if segment and (postings := segment.get(term_id)):
+                parts_docs.append(np.asarray(postings[0], dtype=np.int32))
+                parts_tfs.append(np.asarray(postings[1], dtype=np.uint16))
+        if not parts_docs:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.uint16)
+        if len(parts_docs) == 1:
+            return parts_docs[0], parts_tfs[0]
+        return np.concatenate(parts_docs), np.concatenate(parts_tfs)
+
+    def search(
+        self, query: str, k: int, include: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25 检索, 返回 [(jid, score), ...] 按分数降序, 需在线程中调用
+        include 为 jid 白名单(有序 int64), 为 None 时不过滤
+        锁内只收集倒排表与文档数组的引用, 打分在锁外进行; 合并替换数组而非原地修改, 引用保持一致
+        """
+        terms = Counter(tokenize(query))
+        postings: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        with self._lock:
+            n_docs = len(self._doc_of)
+            if n_docs == 0 or k <= 0:
+                return []
+            avgdl = max(self._total_length / n_docs, 1.0)
+            lengths = self._lengths.view()
+            alive = self._alive.view().copy()
+            doc_jids = self._jids.view()
+            for term, qtf in terms.items():
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    continue
+                docs, tfs = self._postings(term_id)
+                if len(docs):
+                    postings.append((qtf, docs, tfs))
+        if not postings:
+            return []
+        all_docs: List[np.ndarray] = []
+        all_scores: List[np.ndarray] = []
+        for qtf, docs, tfs in postings:
+            # df 含尚未合并剔除的已删除文档, 对 idf 的影响可忽略
+            df = len(docs)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            tf = tfs.astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avgdl)
+            all_docs.append(docs)
+            all_scores.append(qtf * idf * tf * (self.k1 + 1.0) / (tf + norm))
+        docs = np.concatenate(all_docs)
+        scores = np.concatenate(all_scores)
+        unique_docs, inverse = np.unique(docs, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores)
+        keep = alive[unique_docs]
+        jids = doc_jids[unique_docs]
+        if include is not None:
+            keep &= np.isin(jids, include)
+        jids, totals = jids[keep], totals[keep]
+        if len(jids) > k:
+            top = np.argpartition(-totals, k - 1)[:k]
+            jids, totals = jids[top], totals[top]
+        order = np.argsort(-totals, kind="stable")
+        return [(int(jids[i]), float(totals[i])) for i in order]
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 10:12:36
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : query_cache.py
+# @License : Apache-2.0
+# @Desc    : 查询向量缓存(LRU + TTL, 可选 Redis 共享)
+
+import re
+import time
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.telemetry import capture_exception
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    归一化查询文本: NFKC(全角转半角) + 小写 + 合并空白
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 2048,
+        ttl: float = 3600,
+        redis_client=None,
+        namespace: str = "query_embedding",
+    ):
+        """
+        Args:
+            model_name (str): embedding 模型名, 参与缓存键, 切换模型后旧缓存自然失效
+            max_size (int): 进程内最多缓存的查询数, <=0 关闭进程内缓存
+            ttl (float): 缓存有效期(秒), <=0 表示不过期
+            redis_client: 二进制 Redis 客户端(decode_responses=False), 为 None 时不跨进程共享
+            namespace (str): Redis 键前缀
+        """
+        self.model_name = model_name
+        self.max_size = int(max_size)
+        self.ttl = float(ttl)
+        self.redis = redis_client
+        self.namespace = namespace
+        self._data: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _redis_key(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{self.model_name}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expire_at, vec = item
+        if expire_at and expire_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return vec
+
+    def _put_local(self, key: str, vec: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        expire_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        self._data[key] = (expire_at, vec)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[np.ndarray]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(self._redis_key(key))
+        except Exception as e:
+            capture_exception(e)
+            return None
+        if not raw:
+            return None
+        return np.frombuffer(raw, dtype=np.float32)
+
+    async def _put_redis(self, key: str, vec: np.ndarray) -> None:
+        if self.redis is None:
+            return
+        try:
+            ttl = int(self.ttl) if self.ttl > 0 else None
+            await self.redis.set(self._redis_key(key), vec.tobytes(), ex=ttl)
+        except Exception as e:
+            capture_exception(e)
+
+    async def _load(
+        self, key: str, query: str, compute: Callable[[str], Awaitable[List[float]]]
+    ) -> np.ndarray:
+        if (vec := await self._get_redis(key)) is not None:
+            self.redis_hits += 1
+        else:
+            self.misses += 1
+            vec = np.asarray(await compute(query), dtype=np.float32)
+            await self._put_redis(key, vec)
+        vec.setflags(write=False)
+        self._put_local(key, vec)
+        return vec
+
+    def _on_loaded(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        # 避免所有等待方都已取消时出现 "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_compute(
+        self, query: str, compute: Callable[[str], Awaitable[List[float]]]
+    ) -> np.ndarray:
+        """
+        读取查询向量, 未命中时调用 compute 计算并回填
+        相同查询并发到达时只计算一次; 计算在独立任务中进行, 各等待方(包括发起方)
+        均通过 shield 等待, 任一等待方被取消都不会中断计算或影响其它等待方
+        """
+        key = normalize_query(query)
+        if (vec := self._get_local(key)) is not None:
+            self.hits += 1
+            return vec
+
+        if (task := self._inflight.get(key)) is not None:
+            self.hits += 1
+        else:
+            task = asyncio.create_task(self._load(key, query, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_loaded(key, t))
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / total if total else 0.0,
+        }
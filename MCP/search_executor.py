@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:03:52
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : search_executor.py
+# @License : Apache-2.0
+# @Desc    : 向量检索执行器(线程池 + 微批合并)
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SearchRows = List[List[Tuple[int, float]]]
+SearchFn = Callable[[np.ndarray, int], SearchRows]
+
+
+class BatchedSearchExecutor:
+    def __init__(
+        self,
+        search_fn: SearchFn,
+        window: float = 0.002,
+        max_batch: int = 32,
+        max_workers: int = 2,
+    ):
+        """
+        Args:
+            search_fn (SearchFn): 同步批量检索函数, 入参为 (n, d) float32 矩阵和 k,
+                返回 n 行 [(id, score), ...], 在线程池中执行
+            window (float): 微批收集窗口(秒), 仅在检索线程全忙时生效: 排队的查询最多等待该时长,
+                或在任一批次完成、凑满 max_batch 时提交; 有空闲线程时查询立即提交, 不额外等待
+            max_batch (int): 单批最多合并的查询数, 达到后立即提交
+            max_workers (int): 检索线程数
+        """
+        self.search_fn = search_fn
+        self.window = max(0.0, float(window))
+        self.max_batch = max(1, int(max_batch))
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="vector-search"
+        )
+        self._pending: List[Tuple[np.ndarray, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 已提交到线程池、尚未完成的检索数(批次或单独检索)
+        self._running = 0
+        self.batches = 0
+        self.queries = 0
+
+    async def search(self, vec: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((np.asarray(vec, dtype=np.float32), int(k), future))
+        # 有空闲线程时没有可合并的对象, 立即提交; 线程全忙时才攒批
+        if len(self._pending) >= self.max_batch or self._running < self.max_workers:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def run(self, fn: Callable, *args):
+        """
+        在检索线程池中单独执行一次检索(如带过滤条件、无法与其它查询合批的检索)
+        """
+        self.queries += 1
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._running -= 1
+            if self._pending:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [item for item in self._pending if not item[2].cancelled()]
+        self._pending = []
+        if not batch:
+            return
+        # 提交时即计入, 避免任务开始执行前的并发查询都被判定为有空闲线程
+        self._running += 1
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, int, asyncio.Future]]):
+        xq = np.vstack([vec for vec, _, _ in batch])
+        k_max = max(k for _, k, _ in batch)
+        self.batches += 1
+        self.queries += len(batch)
+        loop = asyncio.get_running_loop()
+        try:
+            rows = await loop.run_in_executor(self._pool, self.search_fn, xq, k_max)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._running -= 1
+            # 线程空出后立即提交期间排队的查询
+            if self._pending:
+                self._flush()
+        for (_, k, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row[:k])
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
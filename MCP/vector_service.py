@@ -7,40 +7,252 @@
 
 from __future__ import annotations
 import os
+import json
+import pickle
 import asyncio
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy import event, select
+from collections import deque
+from typing import AsyncIterator, Deque, List, Dict, Mapping, Optional, Tuple
+from sqlalchemy import and_, event, inspect, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from langchain_community.vectorstores import FAISS
+from sqlalchemy.orm import Session, object_session
 from langchain_core.documents import Document
+import faiss
+import numpy as np
 from config.config import Config
+from services.telemetry import capture_exception
 from model.job import Job
-from utils.database import AsyncSessionLocal
+from utils.database import AsyncSessionLocal, redis_binary_client, redis_client
 from .embedding import AsyncOpenAIEmbeddings
+from .embedding_cache import EmbeddingCache
+from .query_cache import QueryEmbeddingCache
+from .search_executor import BatchedSearchExecutor
+from .index_store import SegmentedIndexStore
+from .index_snapshot import IndexSnapshot, IndexTier
+from .index_leader import make_index_coordinator
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .job_cache import JobPayloadCache
+from .attribute_index import (
+    FILTER_FIELDS,
+    AttributeIndex,
+    FilterValue,
+    normalize_filters,
+)
+from .index_factory import (
+    INDEX_FILE,
+    IndexSpec,
+    build_index,
+    index_ids,
+    index_type_of,
+    load_base_index,
+    make_search_params,
+    merge_into_base,
+    needs_rebuild,
+    save_base_index,
+    search_tiers,
+)
+
+LEGACY_DOCSTORE_FILE = "index.pkl"
+RECENT_JOBS_FILE = "recent_jobs.json"
+# _make_document 所需的列(文本 + 结构化过滤字段), 同步时不加载薪资、公司名等其它字段
+SYNC_COLUMNS = (
+    Job.jid,
+    Job.job_title,
+    Job.job_description_requirements,
+    Job.skill_requirements,
+    *(getattr(Job, field) for field in FILTER_FIELDS),
+)
+# 影响向量内容的列, 更新其它列(薪资、地点等)时无需重新 embedding
+EMBEDDED_ATTRS = ("job_title", "job_description_requirements", "skill_requirements")
+SEARCH_MODES = ("vector", "hybrid")
+# 检索结果回填的列, 顺序即返回字典的字段顺序
+PAYLOAD_COLUMNS = (
+    Job.jid,
+    Job.job_title,
+    Job.job_description_requirements,
+    Job.company_name,
+    Job.salary,
+    Job.location,
+    Job.edu_requirement,
+    Job.exp_requirement,
+    Job.company_type,
+    Job.company_industry,
+)
+_EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+
+def _load_legacy_langchain_index(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    读取旧版 LangChain FAISS 索引(index.faiss + index.pkl), 返回 (vectors, jids)
+    仅用于一次性迁移, 迁移后索引不再依赖 pickle
+    """
+    index = faiss.read_index(os.path.join(path, INDEX_FILE))
+    with open(os.path.join(path, LEGACY_DOCSTORE_FILE), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+    keep: List[int] = []
+    jids: List[int] = []
+    for i in range(index.ntotal):
+        doc = docstore.search(index_to_docstore_id.get(i))
+        jid = doc.metadata.get("jid") if isinstance(doc, Document) else None
+        if isinstance(jid, int):
+            keep.append(i)
+            jids.append(jid)
+    if vectors is None or not keep:
+        return np.empty((0, index.d), dtype=np.float32), np.empty(0, dtype=np.int64)
+    return vectors[keep], np.asarray(jids, dtype=np.int64)
 
 
 class JobVectorService:
     def __init__(self, index_dir: str, api_base: str, api_key: str, model_name: str):
         self.index_dir = index_dir
         self.embedding = AsyncOpenAIEmbeddings(
-            base_url=api_base, api_key=api_key, model_name=model_name
+            base_url=api_base,
+            api_key=api_key,
+            model_name=model_name,
+            batch_size=Config.embedding_batch_size,
+            max_concurrency=Config.embedding_max_concurrency,
+            max_retries=Config.embedding_max_retries,
+            retry_backoff=Config.embedding_retry_backoff,
+        )
+        # 文本未变的岗位重建索引时复用已落盘的向量
+        self.embedding_cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(Config.embedding_cache_path, model_name)
+            if Config.embedding_cache_enabled
+            else None
+        )
+        self.query_cache = QueryEmbeddingCache(
+            model_name=model_name,
+            max_size=Config.query_cache_size,
+            ttl=Config.query_cache_ttl,
+            redis_client=redis_binary_client if Config.query_cache_redis else None,
         )
-        self.store: Optional[FAISS] = None
+        self.payload_cache = JobPayloadCache(
+            max_size=Config.job_cache_size,
+            ttl=Config.job_cache_ttl,
+            redis_client=redis_client if Config.job_cache_redis else None,
+            redis_ttl=Config.job_cache_redis_ttl,
+            recent_size=Config.job_cache_warm_size,
+        )
+        # 向量 id 即岗位 jid, 不再维护逐条的 Document/docstore
+        # 检索只读取 self.snapshot 指向的不可变快照, 写入/compaction 生成新快照后整体替换引用
+        self._version = 0
+        self.snapshot = IndexSnapshot(version=0)
+        # compaction 之前的快照, 用于回滚
+        self._history: Deque[Tuple[IndexSnapshot, IndexTier]] = deque(
+            maxlen=max(0, Config.vector_snapshot_history)
+        )
+        self._compacting = False
+        # 关键词倒排索引, 启动时从 MySQL 构建, 之后随向量写入同步更新
+        self.lexical = LexicalIndex(k1=Config.lexical_bm25_k1, b=Config.lexical_bm25_b)
+        # 结构化字段倒排, 用于检索内部的预过滤
+        self.attributes = AttributeIndex()
+        self.index_spec = IndexSpec.from_config()
+        self.nprobe: int = Config.vector_nprobe
+        self.ef_search: int = Config.vector_ef_search
+        # 串行化写入方, 检索不加锁
         self._lock = asyncio.Lock()
+        self.search_executor = BatchedSearchExecutor(
+            self._search_sync,
+            window=Config.vector_search_window_ms / 1000,
+            max_batch=Config.vector_search_max_batch,
+            max_workers=Config.vector_search_threads,
+        )
         self._queue: asyncio.Queue = asyncio.Queue(maxsize=100000)
         self._worker_task: Optional[asyncio.Task] = None
+        # 只影响关键词/结构化字段索引的变更(如仅修改地点), 由后台任务按序在线程中应用
+        self._keyword_queue: asyncio.Queue = asyncio.Queue()
+        self._keyword_task: Optional[asyncio.Task] = None
         self._batch_size: int = 64
+        self._compact_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        # 多 worker 时只有 leader 写索引, 为 None 时本进程直接写入
+        self._leader_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._forward_task: Optional[asyncio.Task] = None
+        self._followed_version: Optional[str] = None
         os.makedirs(self.index_dir, exist_ok=True)
+        self.coordinator = make_index_coordinator(
+            Config.vector_leader_backend,
+            redis_client,
+            self.index_dir,
+            Config.vector_leader_ttl,
+        )
+        self.segments = SegmentedIndexStore(
+            self.index_dir, keep_bases=Config.vector_snapshot_history
+        )
+        self._needs_migration = False
         self._load_or_init()
         self._register_event()
 
     def _load_or_init(self) -> None:
+        self.snapshot, self._needs_migration = self._load_snapshot()
+
+    def _load_snapshot(self) -> Tuple[IndexSnapshot, bool]:
+        """
+        从磁盘加载基线并回放其后的增量段, 返回 (快照, 是否读取的是旧版 LangChain 索引)
+        """
+        # 未做过 compaction 的旧索引直接位于 index_dir 根目录
+        base_path = self.segments.base_path or self.index_dir
+        snapshot = IndexSnapshot(
+            version=self._next_version(), seq=self.segments.manifest["base_seq"]
+        )
+        migrated = False
         try:
-            self.store = FAISS.load_local(
-                self.index_dir, self.embedding, allow_dangerous_deserialization=True
-            )
+            if os.path.exists(os.path.join(base_path, LEGACY_DOCSTORE_FILE)):
+                vectors, jids = _load_legacy_langchain_index(base_path)
+                snapshot = snapshot.apply(
+                    self._next_version(), snapshot.seq, vectors, jids, _EMPTY_IDS
+                )
+                migrated = True
+            elif self.segments.base_path or os.path.exists(
+                os.path.join(base_path, INDEX_FILE)
+            ):
+                base = load_base_index(base_path, mmap=Config.vector_index_mmap)
+                snapshot = IndexSnapshot(
+                    version=self._next_version(),
+                    seq=snapshot.seq,
+                    tiers=(IndexTier.of(base, path=base_path),),
+                )
         except Exception:
-            self.store = None
+            pass
+        for seq, vectors, jids, deleted in self.segments.iter_deltas():
+            snapshot = snapshot.apply(self._next_version(), seq, vectors, jids, deleted)
+        return snapshot.merge_deltas(self._next_version()), migrated
+
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    @property
+    def ntotal(self) -> int:
+        return self.snapshot.ntotal
+
+    @property
+    def is_writer(self) -> bool:
+        return self.coordinator is None or self.coordinator.is_leader
+
+    def _disk_version(self) -> str:
+        return f"{self.segments.manifest.get('generation', 0)}:{self.segments.last_seq}"
+
+    async def _publish_version(self) -> None:
+        if self.coordinator is not None:
+            await self.coordinator.publish(self._disk_version())
+
+    def snapshot_info(self) -> Dict:
+        info = self.snapshot.describe()
+        info["pid"] = os.getpid()
+        info["is_writer"] = self.is_writer
+        info["disk_version"] = self._disk_version()
+        # 回滚历史只保存在执行 compaction 的写入者进程内
+        info["rollback_versions"] = [prev.version for prev, _ in self._history]
+        return info
+
+    def _indexed_jids(self) -> np.ndarray:
+        return self.snapshot.live_jids()
 
     def _make_document(self, job: Job) -> Document:
         content_parts: List[str] = []
@@ -51,138 +263,903 @@ class JobVectorService:
         if job.skill_requirements:
             content_parts.append(job.skill_requirements)
         content = "\n".join([p for p in content_parts if p]).strip()
-        return Document(page_content=content, metadata={"jid": job.jid})
+        metadata = {"jid": job.jid}
+        metadata.update({field: getattr(job, field) for field in FILTER_FIELDS})
+        return Document(page_content=content, metadata=metadata)
+
+    @staticmethod
+    def _lexical_text(doc: Document) -> str:
+        # 地点不参与 embedding, 但需要能被关键词命中
+        return f"{doc.page_content}\n{doc.metadata.get('location') or ''}"
+
+    def _write_sync(
+        self,
+        docs: List[Document],
+        vectors: List[List[float]],
+        removed: Optional[List[int]] = None,
+    ) -> None:
+        jids = np.asarray([d.metadata["jid"] for d in docs], dtype=np.int64)
+        deleted = np.asarray(removed or [], dtype=np.int64)
+        if len(jids):
+            matrix = np.asarray(vectors, dtype=np.float32)
+        elif len(deleted):
+            matrix = np.empty((0, self.snapshot.dim), dtype=np.float32)
+        else:
+            return
+        # 先追加增量段再发布快照, 崩溃后按增量段回放不会丢失已对外可见的写入
+        seq = self.segments.append_delta(matrix, jids, deleted)
+        snapshot = self.snapshot.apply(self._next_version(), seq, matrix, jids, deleted)
+        # 增量层过多时合并, compaction 进行中不合并, 以便其完成后按层替换
+        if (
+            len(snapshot.deltas) > Config.vector_max_delta_tiers
+            and not self._compacting
+        ):
+            snapshot = snapshot.merge_deltas(snapshot.version)
+        self.snapshot = snapshot
+        self._update_keyword_indexes(docs, deleted.tolist())
+
+    def _update_keyword_indexes(
+        self,
+        docs: List[Document],
+        removed: List[int] = (),
+        only_missing: bool = False,
+    ) -> None:
+        self.lexical.update(
+            [(d.metadata["jid"], self._lexical_text(d)) for d in docs],
+            removed,
+            only_missing,
+        )
+        self.attributes.update(
+            [(d.metadata["jid"], d.metadata) for d in docs], removed, only_missing
+        )
 
-    def _add_docs_sync(self, docs: List[Document]) -> None:
-        if self.store is None:
-            self.store = FAISS.from_documents(docs, self.embedding)
+    def _needs_rebuild(self, snapshot: Optional[IndexSnapshot] = None) -> bool:
+        snapshot = snapshot or self.snapshot
+        if not snapshot.tiers:
+            return False
+        return needs_rebuild(snapshot.tiers[0].index, self.index_spec, snapshot.ntotal)
+
+    def _build_base(self, snapshot: IndexSnapshot) -> Optional[IndexTier]:
+        """
+        在后台线程中将快照折叠为新的基线并落盘, 校验通过后才切换 manifest
+        期间写入与检索照常进行, 均不受影响
+        """
+        if not snapshot.tiers:
+            return None
+        base = snapshot.base
+        parts = [t.live_vectors() for t in snapshot.deltas]
+        if parts:
+            delta_vectors = np.vstack([v for v, _ in parts])
+            delta_jids = np.concatenate([j for _, j in parts])
+        else:
+            delta_vectors = np.empty((0, snapshot.dim), dtype=np.float32)
+            delta_jids = _EMPTY_IDS
+        # HNSW 不支持删除, 有失效条目时只能重建
+        hnsw_removed = (
+            base is not None
+            and len(base.exclude) > 0
+            and index_type_of(base.index) == "hnsw"
+        )
+        if hnsw_removed or self._needs_rebuild(snapshot):
+            parts = []
+            if base is not None:
+                # IVF 取向量需切换 direct map, 不能改动正在被检索的基线, 读一份私有副本
+                source = None
+                if index_type_of(base.index) in ("ivf_flat", "ivf_pq"):
+                    source = faiss.read_index(os.path.join(base.path, INDEX_FILE))
+                parts.append(base.live_vectors(source))
+            parts.append((delta_vectors, delta_jids))
+            merged = build_index(
+                self.index_spec,
+                np.vstack([v for v, _ in parts]),
+                np.concatenate([j for _, j in parts]),
+            )
+            print(
+                f"job vector index rebuilt: type={index_type_of(merged)}, ntotal={merged.ntotal}"
+            )
         else:
-            self.store.add_documents(docs)
-        self._shrink_docstore()
-        self.store.save_local(self.index_dir)
+            merged = merge_into_base(
+                base.index if base is not None else None,
+                base.path if base is not None else None,
+                delta_vectors,
+                delta_jids,
+                removed=base.exclude if base is not None else None,
+            )
+        self._validate_build(merged, snapshot)
+        if not self.is_writer:
+            raise RuntimeError("index writer role lost during compaction")
+        self.segments.commit_base(
+            snapshot.seq, lambda path: save_base_index(merged, path)
+        )
+        base_path = self.segments.base_path
+        loaded = load_base_index(base_path, mmap=Config.vector_index_mmap)
+        for name in (INDEX_FILE, LEGACY_DOCSTORE_FILE):
+            legacy = os.path.join(self.index_dir, name)
+            if os.path.exists(legacy):
+                os.remove(legacy)
+        return IndexTier.of(loaded, path=base_path)
+
+    @staticmethod
+    def _validate_build(index, snapshot: IndexSnapshot) -> None:
+        expected = np.sort(snapshot.live_jids())
+        actual = np.sort(index_ids(index))
+        if not np.array_equal(expected, actual):
+            raise RuntimeError(
+                f"index build mismatch: expected {len(expected)} jids, got {len(actual)}"
+            )
+        if len(actual):
+            _, labels = index.search(
+                np.zeros((1, index.d), dtype=np.float32), 1
+            )
+            if labels[0][0] == -1:
+                raise RuntimeError("index build returns no results")
 
-    def _shrink_docstore(self) -> None:
-        if not self.store or not getattr(self.store, "docstore", None):
+    async def compact(self) -> None:
+        """
+        将增量层折叠为新的基线快照; 构建在后台线程进行, 不阻塞写入和检索,
+        完成后把构建期间的新写入重新叠加到新基线之上再切换
+        """
+        if self._compacting or not self.is_writer:
             return
-        d = self.store.docstore._dict
-        for k, v in list(d.items()):
-            jid = v.metadata.get("jid") if getattr(v, "metadata", None) else None
-            d[k] = Document(page_content="", metadata={"jid": jid})
+        self._compacting = True
+        try:
+            # 在写锁内取快照, 保证其后的写入都不会合并其中的增量层
+            async with self._lock:
+                snapshot = self.snapshot
+            try:
+                base = await asyncio.to_thread(self._build_base, snapshot)
+            except Exception as e:
+                # 构建或校验失败时保留当前快照, 不切换 manifest
+                print(f"job vector index compaction failed, keep version {snapshot.version}: {e}")
+                return
+            if base is None:
+                return
+            async with self._lock:
+                current = self.snapshot
+                self.snapshot = current.replace(snapshot, (base,), self._next_version())
+                self._history.append((snapshot, base))
+            self._needs_migration = False
+            print(f"job vector index published: {self.snapshot.describe()}")
+            await self._publish_version()
+        finally:
+            self._compacting = False
+
+    async def rollback(self) -> Dict:
+        """
+        回滚到上一次 compaction 之前的索引, 其后的写入会重新叠加上去
+        manifest 切回保留的旧基线并落盘, 重启与 follower 重新加载后内容一致; 只能由写入者执行
+        """
+        if not self.is_writer:
+            raise RuntimeError("not the index writer")
+        if self._compacting:
+            raise RuntimeError("index compaction in progress")
+        async with self._lock:
+            if not self._history:
+                raise RuntimeError("no previous index snapshot to roll back to")
+            previous, _ = self._history[-1]
+            await asyncio.to_thread(self._rollback_sync, previous)
+            self._history.pop()
+        print(f"job vector index rolled back: {self.snapshot.describe()}")
+        await self._publish_version()
+        return self.snapshot_info()
+
+    def _rollback_sync(self, previous: IndexSnapshot) -> None:
+        base = previous.base
+        name = None
+        if base is not None:
+            name = os.path.basename(base.path or "")
+            # 旧版根目录索引在首次 compaction 后即被删除, 无法回滚
+            if not name.startswith("base-"):
+                raise RuntimeError("previous base is not retained on disk")
+        parts = [t.live_vectors() for t in previous.deltas]
+        if parts:
+            vectors = np.vstack([v for v, _ in parts])
+            jids = np.concatenate([j for _, j in parts])
+        else:
+            vectors = np.empty((0, previous.dim), dtype=np.float32)
+            jids = _EMPTY_IDS
+        deleted = base.exclude if base is not None else _EMPTY_IDS
+        self.segments.rollback_base(name, previous.seq, vectors, jids, deleted)
+        # 按磁盘内容重新加载, 与重启后的状态一致
+        self.snapshot, self._needs_migration = self._load_snapshot()
+
+    async def request_rollback(self) -> Dict:
+        """
+        管理接口入口: 写入者直接回滚, 其它 worker 把回滚请求转发给写入者
+        """
+        if self.is_writer:
+            return await self.rollback()
+        await self.coordinator.forward([json.dumps({"op": "rollback"})])
+        return {"forwarded": True}
+
+    def _maybe_schedule_compaction(self) -> None:
+        if not self.is_writer:
+            return
+        if (
+            len(self.segments.pending_deltas()) < Config.vector_compact_segments
+            and not self._needs_rebuild()
+            and not self._needs_migration
+        ):
+            return
+        if self._compact_task is None or self._compact_task.done():
+            self._compact_task = asyncio.create_task(self.compact())
 
     async def _worker(self) -> None:
-        batch: List[Job] = []
+        # 队列元素为 (jid, Document) 表示新增/更新, (jid, None) 表示删除
+        batch: List[Tuple[int, Optional[Document]]] = []
         while True:
-            job = await self._queue.get()
-            batch.append(job)
+            batch.append(await self._queue.get())
             try:
                 while len(batch) < self._batch_size:
                     try:
-                        next_job = self._queue.get_nowait()
+                        batch.append(self._queue.get_nowait())
                     except asyncio.QueueEmpty:
                         break
-                    else:
-                        batch.append(next_job)
-                await self._upsert_jobs_batch(batch)
+                # 同一批内同一 jid 多次变更只保留最后一次
+                latest: Dict[int, Optional[Document]] = dict(batch)
+                await self._apply_changes(
+                    [doc for doc in latest.values() if doc is not None],
+                    [jid for jid, doc in latest.items() if doc is None],
+                )
+            except Exception as e:
+                print(f"job vector sync failed: {e}")
             finally:
                 for _ in batch:
                     self._queue.task_done()
                 batch.clear()
 
-    async def enqueue_job(self, job: Job) -> None:
+    async def _enqueue(self, jid: int, doc: Optional[Document]) -> None:
         if self._worker_task is None or self._worker_task.done():
             self._worker_task = asyncio.create_task(self._worker())
-        await self._queue.put(job)
+        await self._queue.put((jid, doc))
 
-    async def _upsert_jobs_batch(self, jobs: List[Job]) -> None:
+    async def _keyword_worker(self) -> None:
+        batch: List[Document] = []
+        while True:
+            batch.append(await self._keyword_queue.get())
+            try:
+                while True:
+                    try:
+                        batch.append(self._keyword_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                # 同一 jid 多次变更只保留最后一次
+                latest = {doc.metadata["jid"]: doc for doc in batch}
+                await asyncio.to_thread(self._update_keyword_indexes, list(latest.values()))
+            except Exception as e:
+                capture_exception(e)
+                print(f"job keyword index update failed: {e}")
+            finally:
+                for _ in batch:
+                    self._keyword_queue.task_done()
+                batch.clear()
+
+    def _enqueue_keyword_update(self, doc: Document) -> None:
+        if self._keyword_task is None or self._keyword_task.done():
+            self._keyword_task = asyncio.create_task(self._keyword_worker())
+        self._keyword_queue.put_nowait(doc)
+
+    async def enqueue_job(self, job: Job) -> None:
+        await self._enqueue(job.jid, self._make_document(job))
+
+    async def enqueue_delete(self, jid: int) -> None:
+        await self._enqueue(jid, None)
+
+    async def _add_docs(
+        self, docs: List[Document], removed: Optional[List[int]] = None
+    ) -> None:
+        # 先在事件循环上批量请求 embedding, 再到线程中写入索引
+        vectors = []
+        if docs:
+            vectors = await self._embed_documents([d.page_content for d in docs])
+        await asyncio.to_thread(self._write_sync, docs, vectors, removed)
+        await self._publish_version()
+
+    async def _embed_documents(self, texts: List[str]) -> List:
+        if self.embedding_cache is None:
+            return await self.embedding.aembed_documents(texts)
+        vectors = await asyncio.to_thread(self.embedding_cache.get_many, texts)
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = await self.embedding.aembed_documents(missing_texts)
+            await asyncio.to_thread(self.embedding_cache.put_many, missing_texts, fresh)
+            for i, vec in zip(missing, fresh):
+                vectors[i] = vec
+        return vectors
+
+    async def _apply_changes(
+        self, docs: List[Document], removed: List[int]
+    ) -> None:
+        if not self.is_writer:
+            await self._forward_changes(docs, removed)
+            return
         async with self._lock:
-            docs = [self._make_document(j) for j in jobs]
-            await asyncio.to_thread(self._add_docs_sync, docs)
+            await self._add_docs(docs, removed)
+        self._maybe_schedule_compaction()
+
+    async def _forward_changes(
+        self, docs: List[Document], removed: List[int]
+    ) -> None:
+        """
+        follower 不写索引, 将变更(含 flush 时生成的文档内容)转发给 leader
+        """
+        items = [
+            json.dumps(
+                {"jid": d.metadata["jid"], "text": d.page_content, "metadata": d.metadata},
+                ensure_ascii=False,
+            )
+            for d in docs
+        ]
+        items.extend(json.dumps({"jid": int(jid)}) for jid in removed)
+        try:
+            await self.coordinator.forward(items)
+        except Exception as e:
+            capture_exception(e)
+            print(f"forward job vector changes failed: {e}")
+
+    async def _receive_forwarded(self) -> None:
+        while True:
+            try:
+                items = await self.coordinator.receive(self._batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                capture_exception(e)
+                await asyncio.sleep(1)
+                continue
+            for raw in items:
+                item = json.loads(raw)
+                if item.get("op") == "rollback":
+                    try:
+                        await self.rollback()
+                    except Exception as e:
+                        capture_exception(e)
+                        print(f"job vector index rollback failed: {e}")
+                    continue
+                doc = None
+                if "text" in item:
+                    doc = Document(page_content=item["text"], metadata=item["metadata"])
+                await self._enqueue(int(item["jid"]), doc)
+
+    async def _upsert_jobs_batch(self, jobs: List[Job]) -> None:
+        await self._apply_changes([self._make_document(j) for j in jobs], [])
 
     async def upsert_job(self, job: Job) -> None:
         await self._upsert_jobs_batch([job])
 
-    async def search_ids_async(self, query: str, topn: int) -> List[Tuple[int, float]]:
-        if not self.store:
+    async def delete_jobs(self, jids: List[int]) -> None:
+        await self._apply_changes([], jids)
+
+    def _search_sync(
+        self, xq: np.ndarray, k: int, include: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        在检索线程中执行一次批量 FAISS 检索, 返回每个查询的 [(jid, score), ...]
+        include 为结构化过滤得到的 jid 白名单, 在 ANN 检索内部生效
+        """
+        # 只读取一次快照引用, 检索期间发布的新快照不影响本次检索
+        snapshot = self.snapshot
+        filters = {id(t.index): t.search_filter(include) for t in snapshot.tiers}
+
+        def _params(index):
+            return make_search_params(
+                index, self.nprobe, self.ef_search, filters[id(index)]
+            )
+
+        distances, labels = search_tiers(
+            [t.index for t in snapshot.tiers], xq, k, _params
+        )
+        return [
+            [
+                (int(jid), float(score))
+                for score, jid in zip(dist_row, label_row)
+                if jid != -1
+            ]
+            for dist_row, label_row in zip(distances, labels)
+        ]
+
+    def set_search_params(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ) -> None:
+        """
+        运行时调整检索精度: IVF 的 nprobe / HNSW 的 efSearch, 对下一次检索生效
+        """
+        if nprobe is not None:
+            self.nprobe = int(nprobe)
+        if ef_search is not None:
+            self.ef_search = int(ef_search)
+
+    async def search_ids_async(
+        self,
+        query: str,
+        topn: int,
+        mode: Optional[str] = None,
+        filters: Optional[Mapping[str, FilterValue]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Args:
+            mode (str): vector 仅向量检索, 分数为 L2 距离;
+                hybrid 向量与 BM25 关键词检索按 RRF 融合, 分数为融合分(越大越相关);
+                为 None 时使用 Config.vector_search_mode
+            filters (Mapping[str, FilterValue]): 结构化过滤条件, 字段见 FILTER_FIELDS,
+                同字段多个取值为"或", 不同字段之间为"且", 取值按包含匹配
+        """
+        mode = mode or Config.vector_search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"unknown search mode: {mode}")
+        include = None
+        if normalized := normalize_filters(filters):
+            include = await self._resolve_filters(normalized)
+            if len(include) == 0:
+                return []
+        # 过滤在检索内部完成, 纯向量模式无需多取; 融合模式多取以保证召回深度
+        if mode == "vector" or not self.lexical.ready:
+            return await self._vector_search(query, topn, include)
+        k_fetch = max(topn * 3, topn + 10)
+        # BM25 打分在检索线程池中执行, 与向量检索(含查询 embedding)并行
+        vector_hits, lexical_hits = await asyncio.gather(
+            self._vector_search(query, k_fetch, include),
+            self.search_executor.run(self.lexical.search, query, k_fetch, include),
+        )
+        return reciprocal_rank_fusion(
+            [vector_hits, lexical_hits], k=Config.hybrid_rrf_k
+        )[:topn]
+
+    async def _resolve_filters(self, filters: Dict[str, Tuple[str, ...]]) -> np.ndarray:
+        if self.attributes.ready:
+            return self.attributes.resolve(filters)
+        # 启动构建完成前回退到 MySQL 模糊匹配, 语义与 AttributeIndex 一致
+        conditions = [
+            or_(*(getattr(Job, field).contains(v) for v in values))
+            for field, values in filters.items()
+        ]
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Job.jid).where(and_(*conditions)))
+            jids = np.asarray(result.scalars().all(), dtype=np.int64)
+        return np.unique(jids)
+
+    async def _vector_search(
+        self, query: str, k: int, include: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        if self.ntotal == 0:
             return []
-        # print(f"search_ids_async: query={query}, topn={topn}")
-        vec = await self.embedding.aembed_query(query)
+        # print(f"search_ids_async: query={query}, k={k}")
+        vec = await self.query_cache.get_or_compute(query, self.embedding.aembed_query)
         # print(f"search_ids_async: vec length={len(vec)}")
-        k_fetch = max(topn * 3, topn + 10)
-        results = self.store.similarity_search_with_score_by_vector(vec, k=k_fetch)
+        if include is None:
+            results = await self.search_executor.search(vec, k)
+        else:
+            # 过滤条件因查询而异, 不参与微批合并
+            rows = await self.search_executor.run(
+                self._search_sync, np.asarray(vec, dtype=np.float32)[None, :], k, include
+            )
+            results = rows[0]
         # print(f"search_ids_async: results length={len(results)}")
         seen: set[int] = set()
         out: List[Tuple[int, float]] = []
-        for doc, score in results:
-            jid = doc.metadata.get("jid") if doc.metadata else None
+        for jid, score in results:
             # print(f"search_ids_async: jid={jid}, score={score}")
             if isinstance(jid, int) and jid not in seen:
                 seen.add(jid)
                 out.append((jid, float(score)))
-                if len(out) >= topn:
-                    break
         # print(f"search_ids_async: out length={len(out)}")
         return out
 
-    async def search_async(self, query: str, topn: int) -> List[Dict]:
-        pairs = await self.search_ids_async(query, topn)
+    async def _hydrate(self, jids: List[int]) -> Dict[int, Dict]:
+        """
+        按 jid 读取岗位展示字段, 先查缓存, 只有未命中的部分才查询 MySQL
+        """
+        payloads = await self.payload_cache.get_many(jids)
+        missing = [jid for jid in jids if jid not in payloads]
+        if not missing:
+            return payloads
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(*PAYLOAD_COLUMNS).where(Job.jid.in_(missing))
+            )
+            loaded = {
+                row.jid: {col.key: getattr(row, col.key) for col in PAYLOAD_COLUMNS[1:]}
+                for row in result.all()
+            }
+        await self.payload_cache.put_many(loaded)
+        payloads.update(loaded)
+        return payloads
+
+    async def search_async(
+        self,
+        query: str,
+        topn: int,
+        mode: Optional[str] = None,
+        filters: Optional[Mapping[str, FilterValue]] = None,
+    ) -> List[Dict]:
+        pairs = await self.search_ids_async(query, topn, mode, filters)
         if not pairs:
             return []
-        jids = [jid for jid, _ in pairs]
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(select(Job).where(Job.jid.in_(jids)))
-            jobs: List[Job] = result.scalars().all()
-        job_map: Dict[int, Job] = {j.jid: j for j in jobs}
+        payloads = await self._hydrate([jid for jid, _ in pairs])
         out: List[Dict] = []
         for jid, score in pairs:
-            if j := job_map.get(jid):
-                out.append(
-                    {
-                        "jid": j.jid,
-                        "score": score,
-                        "job_title": j.job_title,
-                        "job_description_requirements": j.job_description_requirements,
-                        "company_name": j.company_name,
-                        "salary": j.salary,
-                        "location": j.location,
-                        "edu_requirement": j.edu_requirement,
-                        "exp_requirement": j.exp_requirement,
-                        "company_type": j.company_type,
-                        "company_industry": j.company_industry,
-                    }
-                )
+            if (payload := payloads.get(jid)) is not None:
+                out.append({"jid": jid, "score": score, **payload})
         return out
 
+    async def _warm_payload_cache(self) -> None:
+        jids = await self.payload_cache.recent_jids(
+            os.path.join(self.index_dir, RECENT_JOBS_FILE)
+        )
+        if jids:
+            await self._hydrate(jids)
+            print(f"job payload cache warmed: jobs={len(jids)}")
+
+    async def close(self) -> None:
+        for task in (
+            self._leader_task,
+            self._sync_task,
+            self._forward_task,
+            self._reconcile_task,
+            self._compact_task,
+            self._keyword_task,
+        ):
+            if task is not None and not task.done():
+                task.cancel()
+        if self.coordinator is not None:
+            await self.coordinator.resign()
+        try:
+            self.payload_cache.save_recent(os.path.join(self.index_dir, RECENT_JOBS_FILE))
+        except OSError as e:
+            print(f"save recent jobs failed: {e}")
+        self.search_executor.shutdown()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+
     async def initial_sync(self) -> None:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(select(Job))
-            jobs: List[Job] = result.scalars().all()
-        if not jobs:
+        try:
+            await self._warm_payload_cache()
+        except Exception as e:
+            print(f"job payload cache warm failed: {e}")
+        try:
+            # 关键词索引各 worker 都需要, 只读 MySQL 不做 embedding
+            await self._build_keyword_indexes()
+        finally:
+            if self.coordinator is None:
+                await self._run_writer()
+            elif self._leader_task is None or self._leader_task.done():
+                self._leader_task = asyncio.create_task(self._leader_loop())
+
+    async def _run_writer(self) -> None:
+        try:
+            await self._initial_sync()
+        finally:
+            # 索引类型配置变化时, 即使没有新岗位也需要迁移
+            self._maybe_schedule_compaction()
+            self._start_reconcile_loop()
+
+    async def _leader_loop(self) -> None:
+        """
+        定期抢占/续期写入者锁: 成为 leader 后接管同步、对账与转发队列,
+        失去锁后立即停止写入; follower 则按版本号跟随 leader 的索引
+        """
+        interval = min(
+            Config.vector_follower_poll_interval, Config.vector_leader_ttl / 3
+        )
+        while True:
+            was_leader = self._sync_task is not None
+            is_leader = await self.coordinator.elect()
+            try:
+                if is_leader and not was_leader:
+                    await self._promote()
+                elif not is_leader and was_leader:
+                    self._demote()
+                if not is_leader:
+                    await self._follow()
+            except Exception as e:
+                capture_exception(e)
+                print(f"job vector leader loop failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _promote(self) -> None:
+        # 先追上上一任 leader 写入的全部内容, 并对齐增量段序号
+        async with self._lock:
+            await self._follow(force=True)
+        print(f"job vector index writer elected: pid={os.getpid()}")
+        self._sync_task = asyncio.create_task(self._run_writer())
+        self._forward_task = asyncio.create_task(self._receive_forwarded())
+
+    def _demote(self) -> None:
+        for task in (
+            self._sync_task,
+            self._forward_task,
+            self._reconcile_task,
+            self._compact_task,
+        ):
+            if task is not None and not task.done():
+                task.cancel()
+        self._sync_task = self._forward_task = None
+        print(f"job vector index writer lost: pid={os.getpid()}")
+
+    async def _follow(self, force: bool = False) -> None:
+        """
+        版本号变化时从共享索引目录加载 leader 写入的新增量段或新基线,
+        并按其中的 jid 刷新关键词索引与本地回填缓存
+        """
+        version = await self.coordinator.current_version()
+        if not force and (version is None or version == self._followed_version):
+            return
+        touched, removed = await asyncio.to_thread(self._reload_sync)
+        if len(touched) or len(removed):
+            await self._refresh_keyword_indexes(touched, removed)
+        self._followed_version = version
+
+    def _reload_sync(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        返回 (有写入的 jid, 被删除的 jid)
+        """
+        self.segments.refresh()
+        current = self.snapshot
+        base_path = current.base.path if current.base is not None else None
+        if self.segments.base_path == base_path:
+            snapshot = current
+            touched = [_EMPTY_IDS]
+            removed = [_EMPTY_IDS]
+            for seq, vectors, jids, deleted in self.segments.iter_deltas(after=current.seq):
+                snapshot = snapshot.apply(self._next_version(), seq, vectors, jids, deleted)
+                touched.append(jids)
+                removed.append(deleted)
+            if snapshot is current:
+                return _EMPTY_IDS, _EMPTY_IDS
+            if len(snapshot.deltas) > Config.vector_max_delta_tiers:
+                snapshot = snapshot.merge_deltas(snapshot.version)
+            self.snapshot = snapshot
+            touched = np.unique(np.concatenate(touched))
+            removed = np.setdiff1d(np.concatenate(removed), touched)
+            return touched, removed
+        # leader 切换了基线, 整体重新映射; 期间错过的文本更新由 leader 的对账兜底
+        snapshot, self._needs_migration = self._load_snapshot()
+        before, after = current.live_jids(), snapshot.live_jids()
+        self.snapshot = snapshot
+        print(f"job vector index reloaded: {snapshot.describe()}")
+        return np.setdiff1d(after, before), np.setdiff1d(before, after)
+
+    async def _refresh_keyword_indexes(
+        self, touched: np.ndarray, removed: np.ndarray
+    ) -> None:
+        page_size = Config.vector_sync_page_size
+        jids = touched.tolist()
+        for start in range(0, len(jids), page_size):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(*SYNC_COLUMNS).where(
+                        Job.jid.in_(jids[start : start + page_size])
+                    )
+                )
+                docs = [self._make_document(r) for r in result.all()]
+            await asyncio.to_thread(self._update_keyword_indexes, docs)
+        if len(removed):
+            await asyncio.to_thread(self._update_keyword_indexes, [], removed.tolist())
+        self.payload_cache.invalidate_local(jids + removed.tolist())
+
+    async def _build_keyword_indexes(self) -> None:
+        """
+        从 MySQL 分页构建关键词索引与结构化字段索引, 只读文本列不做 embedding;
+        构建完成前 hybrid 退化为纯向量检索, 过滤条件回退到 MySQL 查询
+        """
+        page_size = Config.vector_sync_page_size
+        after_jid = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(*SYNC_COLUMNS)
+                    .where(Job.jid > after_jid)
+                    .order_by(Job.jid)
+                    .limit(page_size)
+                )
+                rows = result.all()
+            if not rows:
+                break
+            after_jid = rows[-1].jid
+            docs = [self._make_document(r) for r in rows]
+            await asyncio.to_thread(self._update_keyword_indexes, docs, (), True)
+        self.lexical.ready = True
+        self.attributes.ready = True
+        print(f"job keyword indexes built: docs={len(self.lexical)}")
+
+    async def _iter_job_jids(self) -> AsyncIterator[np.ndarray]:
+        page_size = Config.vector_sync_page_size
+        after_jid = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Job.jid)
+                    .where(Job.jid > after_jid)
+                    .order_by(Job.jid)
+                    .limit(page_size)
+                )
+                page_jids = np.asarray(result.scalars().all(), dtype=np.int64)
+            if len(page_jids) == 0:
+                return
+            after_jid = int(page_jids[-1])
+            yield page_jids
+
+    async def reconcile(self) -> Tuple[int, int]:
+        """
+        对账: 全量比对 MySQL 与索引中的 jid, 删除已不存在的岗位向量, 补齐遗漏的岗位
+        用于兜底绕过 ORM 事件的批量 UPDATE/DELETE 和进程崩溃丢失的队列任务
+        返回 (删除数, 补齐数)
+        """
+        # 先取索引快照: 快照中的 jid 若在随后的扫描中不存在, 才是真正被删除的岗位
+        indexed = self._indexed_jids()
+        pages = [page async for page in self._iter_job_jids()]
+        db_jids = np.concatenate(pages) if pages else _EMPTY_IDS
+        stale = np.setdiff1d(indexed, db_jids)
+        missing = np.setdiff1d(db_jids, indexed)
+        if len(stale):
+            await self.delete_jobs(stale.tolist())
+            await self.payload_cache.invalidate(stale.tolist())
+        page_size = Config.vector_sync_page_size
+        for start in range(0, len(missing), page_size):
+            chunk = missing[start : start + page_size].tolist()
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(*SYNC_COLUMNS).where(Job.jid.in_(chunk))
+                )
+                rows = result.all()
+            if rows:
+                await self._apply_changes([self._make_document(r) for r in rows], [])
+        if len(stale) or len(missing):
+            print(
+                f"job vector index reconciled: removed={len(stale)}, added={len(missing)}"
+            )
+        return len(stale), len(missing)
+
+    async def _reconcile_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"job vector reconcile failed: {e}")
+
+    def _start_reconcile_loop(self) -> None:
+        interval = Config.vector_reconcile_interval
+        if interval <= 0:
             return
-        existing_jids: set[int] = set()
-        if self.store and getattr(self.store, "docstore", None):
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop(interval))
+
+    async def _iter_unindexed_jobs(
+        self, after_jid: int, indexed: np.ndarray
+    ) -> AsyncIterator[Tuple[List, int]]:
+        """
+        按 jid 键集分页遍历 job 表, 每页先只取 jid, 再只为未入索引的岗位读取文本列
+        产出 (rows, 本页最大 jid)
+        """
+        page_size = Config.vector_sync_page_size
+        while True:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Job.jid)
+                    .where(Job.jid > after_jid)
+                    .order_by(Job.jid)
+                    .limit(page_size)
+                )
+                page_jids = np.asarray(result.scalars().all(), dtype=np.int64)
+                if len(page_jids) == 0:
+                    return
+                missing = page_jids[~np.isin(page_jids, indexed)]
+                rows = []
+                if len(missing):
+                    result = await session.execute(
+                        select(*SYNC_COLUMNS)
+                        .where(Job.jid.in_(missing.tolist()))
+                        .order_by(Job.jid)
+                    )
+                    rows = result.all()
+            after_jid = int(page_jids[-1])
+            yield rows, after_jid
+
+    async def _initial_sync(self) -> None:
+        """
+        流式增量同步: 从持久化的同步水位开始分页, 读取与 embedding/写索引流水线并行,
+        内存占用与岗位总数无关; 每页之间释放写锁, 实时写入与检索不受阻塞
+        """
+        indexed = self._indexed_jids()
+        high_water = int(self.segments.manifest.get("sync_high_water", 0))
+        pages: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+        async def _produce() -> None:
             try:
-                for _, d in self.store.docstore._dict.items():
-                    jid = d.metadata.get("jid")
-                    if isinstance(jid, int):
-                        existing_jids.add(jid)
+                async for page in self._iter_unindexed_jobs(high_water, indexed):
+                    await pages.put(page)
+            except asyncio.CancelledError:
+                # 只有消费端退出时才会被取消, 无需再投递结束标记
+                raise
             except Exception:
-                existing_jids = set()
-        new_jobs = [j for j in jobs if j.jid not in existing_jids]
-        if not new_jobs:
-            return
-        async with self._lock:
-            docs = [self._make_document(j) for j in new_jobs]
-            await asyncio.to_thread(self._add_docs_sync, docs)
+                await pages.put(None)
+                raise
+            await pages.put(None)
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while (page := await pages.get()) is not None:
+                rows, last_jid = page
+                if rows:
+                    async with self._lock:
+                        await self._add_docs([self._make_document(r) for r in rows])
+                # 本页已全部写入增量段后才推进水位
+                await asyncio.to_thread(
+                    self.segments.update_meta, sync_high_water=last_jid
+                )
+                self._maybe_schedule_compaction()
+        finally:
+            if not producer.done():
+                producer.cancel()
+        await producer
 
     def _register_event(self) -> None:
-        def _after_insert(mapper, connection, target):
+        # 在 flush 时即生成 Document, 避免提交后访问过期属性
+        def _submit(jid: int, doc: Optional[Document]) -> None:
             try:
                 loop = asyncio.get_running_loop()
-                loop.create_task(self.enqueue_job(target))
+                loop.create_task(self._enqueue(jid, doc))
             except RuntimeError:
-                asyncio.run(self.upsert_job(target))
+                asyncio.run(self._apply_changes([doc] if doc else [], [] if doc else [jid]))
+
+        def _invalidate(jids: List[int]) -> None:
+            self.payload_cache.invalidate_local(jids)
+            try:
+                loop = asyncio.get_running_loop()
+                loop.create_task(self.payload_cache.invalidate(jids))
+            except RuntimeError:
+                asyncio.run(self.payload_cache.invalidate(jids))
+
+        # 回填缓存须在事务提交后才失效: flush 时失效, 并发检索仍可能读到旧的已提交行并写回缓存
+        dirty_key = f"job_payload_dirty:{id(self)}"
+
+        def _mark_dirty(target) -> None:
+            session = object_session(target)
+            if session is None:
+                _invalidate([target.jid])
+                return
+            session.info.setdefault(dirty_key, set()).add(target.jid)
+
+        def _after_commit(session):
+            if jids := session.info.pop(dirty_key, None):
+                _invalidate(list(jids))
+
+        def _after_soft_rollback(session, previous_transaction):
+            # 只有最外层事务回滚才丢弃; 回滚 savepoint 时外层的变更仍可能提交
+            if previous_transaction.parent is None:
+                session.info.pop(dirty_key, None)
+
+        def _after_insert(mapper, connection, target):
+            _mark_dirty(target)
+            _submit(target.jid, self._make_document(target))
+
+        def _after_update(mapper, connection, target):
+            _mark_dirty(target)
+            state = inspect(target)
+            if any(state.attrs[key].history.has_changes() for key in EMBEDDED_ATTRS):
+                _submit(target.jid, self._make_document(target))
+            elif any(state.attrs[key].history.has_changes() for key in FILTER_FIELDS):
+                doc = self._make_document(target)
+                try:
+                    asyncio.get_running_loop()
+                    self._enqueue_keyword_update(doc)
+                except RuntimeError:
+                    self._update_keyword_indexes([doc])
+                if self.coordinator is not None:
+                    # 其它 worker 只能从增量段感知变更; 文本未变, embedding 缓存命中不会重新请求接口
+                    _submit(target.jid, doc)
+
+        def _after_delete(mapper, connection, target):
+            _mark_dirty(target)
+            _submit(target.jid, None)
 
         event.listen(Job, "after_insert", _after_insert)
+        event.listen(Job, "after_update", _after_update)
+        event.listen(Job, "after_delete", _after_delete)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
 
 
 job_vector_service: Optional[JobVectorService] = None
@@ -210,3 +1187,8 @@ def init_job_vector_service() -> None:
         loop.create_task(job_vector_service.initial_sync())
     except RuntimeError:
         asyncio.run(job_vector_service.initial_sync())
+
+
+async def close_job_vector_service() -> None:
+    if job_vector_service is not None:
+        await job_vector_service.close()
@@ -10,8 +10,10 @@ import importlib
 from fastapi import APIRouter
 from .auth import router as auth_router
 from .sessions import router as sessions_router
+from .admin import router as admin_router
 
 router = APIRouter(prefix="/api")
 
 router.include_router(auth_router)
 router.include_router(sessions_router)
+router.include_router(admin_router)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:05:27
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : admin.py
+# @License : Apache-2.0
+# @Desc    : 运维管理 API(向量索引快照查看与回滚)
+
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from config.config import Config
+from MCP import vector_service
+
+router = APIRouter(prefix="/admin")
+
+
+def verify_admin_token(x_admin_token: str = Header(None)) -> None:
+    # 未配置 admin_token 时管理接口整体关闭
+    if not Config.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, Config.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token"
+        )
+
+
+def _job_vector_service():
+    if vector_service.job_vector_service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vector service not initialized",
+        )
+    return vector_service.job_vector_service
+
+
+@router.get("/vector_index", dependencies=[Depends(verify_admin_token)])
+async def get_vector_index():
+    """
+    当前 worker 的索引快照信息; 回滚历史只在写入者上可见
+    """
+    return _job_vector_service().snapshot_info()
+
+
+@router.post("/vector_index/rollback", dependencies=[Depends(verify_admin_token)])
+async def rollback_vector_index():
+    """
+    回滚到上一次 compaction 之前的索引, 非写入者 worker 会把请求转发给写入者
+    """
+    try:
+        return await _job_vector_service().request_rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -21,14 +21,21 @@ from utils.security import get_current_user
 from utils.database import get_db, get_redis, get_mongo, get_neo4j, neo4j_driver
 from config import MAIN_SYSTEM_PROMPT
 from services.llm import (
-    load_portrait_data,
+    load_portrait_text,
     chat_doubao,
     generate_character_portrait,
     compress_message,
     job_search_topn,
     rename_session_name,
 )
-from tokenizer import get_messages_token_count
+from services.tool_call import ToolCallParser
+from services.stream import coalesce_stream
+from services.session_store import (
+    append_session_context,
+    load_session_context,
+    reset_session_context,
+)
+from tokenizer import exceeds_token_limit
 from services.data import (
     increment_save_chat_history,
     save_compress_data,
@@ -53,10 +60,7 @@ async def create_session(
     redis_key = f"{uid}:session"
     await rds.set(redis_key, session_id, ex=7 * 24 * 60 * 60)
     messages = [{"role": "system", "content": MAIN_SYSTEM_PROMPT}]
-    messages_key = f"session:{session_id}:messages"
-    await rds.set(
-        messages_key, json.dumps(messages, ensure_ascii=False), ex=24 * 60 * 60
-    )
+    await reset_session_context(rds, session_id, messages)
     session = Session(sid=session_id, uid=uid, session_name="新会话")
     db.add(session)
     await db.flush()
@@ -86,12 +90,14 @@ async def chat_session(
     if not session_id:
         return {"error": "会话不存在"}
 
-    messages_key = f"session:{session_id}:messages"
-    messages_json = await rds.get(messages_key)
-    if not messages_json:
+    context = await load_session_context(rds, session_id)
+    if not context:
         return {"error": "会话不存在"}
-    messages: list[dict[str, str]] = json.loads(messages_json)
-    character_portrait = await load_portrait_data(neo4j, session_id)
+    messages, _ = context
+    # 之前的消息已在 Redis 中, 本轮只追加 persisted 之后的新消息
+    persisted = len(messages)
+    # 画像文本走 Redis 缓存, 仅在后台画像更新后的首次请求读取 Neo4j
+    character_portrait = await load_portrait_text(neo4j, session_id)
     messages.append(
         {
             "role": "user",
@@ -104,15 +110,12 @@ async def chat_session(
         await increment_save_chat_history(mongo, session_id, "user", chat_request)
         print(f"user: {chat_request}")
 
-        async def stream_model(msgs):
-            async for c in chat_doubao(msgs, stream=True):
-                yield c
+        def stream_model(msgs):
+            # 逐 token 输出按字符数 / 时间窗口合并后再下发, 减少 SSE 帧与 json 编码次数
+            return coalesce_stream(chat_doubao(msgs, stream=True))
 
-        tool_buffer = ""
-        head = ""
+        parser = ToolCallParser()
         assistant_buffer = ""
-        in_tool_call = False
-        stream_mode_locked = False
 
         model_stream = stream_model(messages)
 
@@ -121,6 +124,12 @@ async def chat_session(
                 chunk = await model_stream.__anext__()
                 # print(f"chunk: {chunk}")
             except StopAsyncIteration:
+                if rest := parser.finish():
+                    assistant_buffer += rest
+                    yield f"data: {json.dumps({'role': 'assistant', 'content': rest})}\n\n"
+                if parser.error:
+                    print(f"tool call parse failed: {parser.error}")
+                    yield f"data: {json.dumps({'role': 'tool', 'status': 'error', 'content': parser.error})}\n\n"
                 if assistant_buffer.strip():
                     # 持久化助手回复
                     await increment_save_chat_history(
@@ -128,9 +137,12 @@ async def chat_session(
                     )
                     print(f"assistant_buffer: {assistant_buffer}")
                     messages.append({"role": "assistant", "content": assistant_buffer})
-                    tokens = await get_messages_token_count(messages)
-                    # 200k tokens 压缩, chat_doubao 支持 256k 上下文
-                    if tokens > 200000:
+                    # 追加本轮消息并刷新过期时间, 只对新增消息计数, 返回台账中的会话 token 总数
+                    tokens = await append_session_context(
+                        rds, session_id, messages[persisted:]
+                    )
+                    # 超过上下文上限(默认 200k, chat_doubao 支持 256k)时压缩, 直接比较台账总数, 不重新分词
+                    if await exceeds_token_limit(messages, tokens):
                         compress_data = await compress_message(messages)
                         await save_compress_data(mongo, session_id, compress_data)
                         messages = [
@@ -140,12 +152,7 @@ async def chat_session(
                                 "content": f"上下文超限, 请使用压缩数据重启: {compress_data}",
                             },
                         ]
-                    # 缓存 + 重置过期时间
-                    await rds.set(
-                        messages_key,
-                        json.dumps(messages, ensure_ascii=False),
-                        ex=24 * 60 * 60,
-                    )
+                        await reset_session_context(rds, session_id, messages)
                     # 后台生成人物画像
                     messages_snapshot = copy.deepcopy(messages[:-20])
 
@@ -168,62 +175,52 @@ async def chat_session(
                     )
                 break
 
-            if not in_tool_call:
-                if len(head) < 12:
-                    head += chunk
-                    continue
-
-                if not stream_mode_locked:
-                    if head.startswith("[TOOL_CALL]"):
-                        in_tool_call = True
-                        continue
-                    assistant_buffer += head
-                    stream_mode_locked = True
-                    yield f"data: {json.dumps({'role': 'assistant', 'content': head})}\n\n"
-                else:
-                    assistant_buffer += chunk
-                    yield f"data: {json.dumps({'role': 'assistant', 'content': chunk})}\n\n"
+            # 普通回复一旦确定不是 [TOOL_CALL] 即逐块下发, 工具调用在 JSON 闭合时解析一次
+            if text := parser.feed(chunk):
+                assistant_buffer += text
+                yield f"data: {json.dumps({'role': 'assistant', 'content': text})}\n\n"
+            if not parser.done:
                 continue
 
-            tool_buffer += chunk
-            json_str = tool_buffer.strip("`")
-
-            try:
-                if json_str.startswith("json"):
-                    json_str = json_str[4:].strip()
-                tool_json = json.loads(json_str)
-            except json.JSONDecodeError:
+            tool_json = parser.tool_call or {}
+            json_str = parser.tool_text
+            tool_params = tool_json.get("tool_params")
+            if tool_json.get("tool_name") != "job_search_topn" or not (
+                isinstance(tool_params, dict) and "query" in tool_params and "topn" in tool_params
+            ):
+                # 解析失败或不支持的工具: 结束本轮, 工具调用块剩余内容(闭合围栏等)不再下发和保存,
+                # 已完成的 parser 不再输出文本, 错误在流结束时以 error 事件下发
+                parser.error = parser.error or f"unsupported tool call: {json_str[:200]}"
+                await model_stream.aclose()
                 continue
 
-            if tool_json.get("tool_name") == "job_search_topn":
-                yield f"data: {json.dumps({'role': 'tool', 'status': 'runnings', 'tool_name': 'job_search_topn', 'content': tool_json['tool_params']['query']})}\n\n"
-                tool_result = await job_search_topn(
-                    tool_json["tool_params"]["query"],
-                    int(tool_json["tool_params"]["topn"]),
-                )
-                print(f"job_search_topn: {tool_result}")
-                yield f"data: {json.dumps({'role': 'tool', 'status': 'success', 'tool_name': 'job_search_topn', 'content': tool_json['tool_params']['query']})}\n\n"
-
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": f"[TOOL_CALL]\n```json\n{json_str}\n```",
-                    }
-                )
-                messages.append(
-                    {
-                        "role": "user",
-                        "content": f"[TOOL_CALL] job_search_topn tool output: {json.dumps(tool_result, ensure_ascii=False)}",
-                    }
-                )
-
-                model_stream = stream_model(messages)
-
-            tool_buffer = ""
-            head = ""
+            yield f"data: {json.dumps({'role': 'tool', 'status': 'runnings', 'tool_name': 'job_search_topn', 'content': tool_json['tool_params']['query']})}\n\n"
+            tool_result = await job_search_topn(
+                tool_json["tool_params"]["query"],
+                int(tool_json["tool_params"]["topn"]),
+                tool_json["tool_params"].get("filters"),
+            )
+            print(f"job_search_topn: {tool_result}")
+            yield f"data: {json.dumps({'role': 'tool', 'status': 'success', 'tool_name': 'job_search_topn', 'content': tool_json['tool_params']['query']})}\n\n"
+
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": f"[TOOL_CALL]\n```json\n{json_str}\n```",
+                }
+            )
+            messages.append(
+                {
+                    "role": "user",
+                    "content": f"[TOOL_CALL] job_search_topn tool output: {json.dumps(tool_result, ensure_ascii=False)}",
+                }
+            )
+
+            await model_stream.aclose()
+            model_stream = stream_model(messages)
+
+            parser = ToolCallParser()
             assistant_buffer = ""
-            in_tool_call = False
-            stream_mode_locked = False
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -320,8 +317,5 @@ async def preload_session(
     messages = [{"role": "system", "content": MAIN_SYSTEM_PROMPT}]
     loads_messages = await load_messages(mongo, session_id)
     messages.extend(loads_messages)
-    messages_key = f"session:{session_id}:messages"
-    await rds.set(
-        messages_key, json.dumps(messages, ensure_ascii=False), ex=24 * 60 * 60
-    )
+    await reset_session_context(rds, session_id, messages)
     return {"session_id": session_id, "session_name": session.session_name}
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:52:10
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : __init__.py
+# @License : Apache-2.0
+# @Desc    : 性能基准测试
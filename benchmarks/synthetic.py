@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:54:37
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : synthetic.py
+# @License : Apache-2.0
+# @Desc    : 合成岗位语料与本地确定性 embedding(替代 embedding 接口, 用于基准测试)
+
+import hashlib
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from MCP.lexical_index import tokenize
+
+TITLES = [
+    "Java开发工程师", "Python开发工程师", "Go后端工程师", "C++开发工程师", "前端开发工程师",
+    "Android开发工程师", "iOS开发工程师", "测试工程师", "测试开发工程师", "运维工程师",
+    "数据分析师", "数据开发工程师", "算法工程师", "机器学习工程师", "推荐算法工程师",
+    "产品经理", "项目经理", "UI设计师", "交互设计师", "技术支持工程师",
+    "嵌入式软件工程师", "硬件工程师", "网络安全工程师", "DBA", "架构师",
+    "销售代表", "客户经理", "市场专员", "新媒体运营", "用户运营",
+    "人力资源专员", "招聘专员", "财务专员", "会计", "法务专员",
+    "行政专员", "商务拓展", "售前工程师", "实施工程师", "技术文档工程师",
+]
+SKILLS = [
+    "Java", "Spring", "MySQL", "Redis", "Kafka", "Python", "Django", "FastAPI",
+    "Go", "gRPC", "C++", "Linux", "Docker", "Kubernetes", "React", "Vue",
+    "TypeScript", "Node.js", "Android", "Kotlin", "Swift", "Selenium", "JMeter",
+    "Shell", "Ansible", "SQL", "Excel", "Tableau", "Spark", "Hive", "Flink",
+    "PyTorch", "TensorFlow", "NLP", "CV", "Axure", "Figma", "PMP", "Jira",
+    "STM32", "RTOS", "PCB", "渗透测试", "Oracle", "MongoDB", "Elasticsearch",
+    "微服务", "分布式", "高并发", "数据挖掘", "统计学", "沟通能力", "英语",
+    "CRM", "SEO", "短视频", "社群运营", "财务分析", "税务", "合同审核",
+]
+CITIES = [
+    "北京", "上海", "广州", "深圳", "杭州", "南京", "苏州", "成都", "武汉", "西安",
+    "重庆", "天津", "长沙", "郑州", "合肥", "厦门", "青岛", "济南", "大连", "沈阳",
+]
+INDUSTRIES = [
+    "互联网", "电子商务", "金融", "教育培训", "医疗健康", "智能制造", "汽车",
+    "通信", "游戏", "企业服务", "物流", "房地产", "新能源", "半导体", "文化传媒",
+]
+EDUCATIONS = ["不限", "大专", "本科", "硕士", "博士"]
+EXPERIENCES = ["不限", "应届生", "1-3年", "3-5年", "5-10年", "10年以上"]
+SKILLS_PER_JOB = 3
+
+
+def _token_vector(token: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+class HashEmbeddings:
+    """
+    确定性的本地 embedding: 文本向量 = 各词项(与关键词索引相同的切分)随机向量之和再归一化,
+    词项重叠越多的文本向量越接近, 接口与 AsyncOpenAIEmbeddings 一致
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = int(dim)
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def token_vector(self, token: str) -> np.ndarray:
+        if (vec := self._cache.get(token)) is None:
+            vec = self._cache[token] = _token_vector(token, self.dim)
+        return vec
+
+    def raw(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            vec += self.token_vector(token)
+        return vec
+
+    def embed(self, text: str) -> List[float]:
+        vec = self.raw(text)
+        norm = float(np.linalg.norm(vec))
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed(text)
+
+
+class SyntheticJobCorpus:
+    """
+    按 (岗位名, 技能 x3, 城市, 行业) 随机组合生成岗位, jid 从 1 开始连续编号, 同一 seed 结果完全一致
+
+    岗位向量按字段向量直接相加生成, 等价于 HashEmbeddings 对 "岗位名 技能 城市 行业" 编码,
+    另叠加少量噪声, 避免百万规模下出现大量完全相同的向量; 无需逐条切词, 百万条可在数秒内生成
+    """
+
+    def __init__(self, dim: int = 256, seed: int = 42, noise: float = 0.3):
+        self.dim = int(dim)
+        self.seed = int(seed)
+        self.noise = float(noise)
+        self.embeddings = HashEmbeddings(self.dim)
+        self._fields = {
+            "title": self._field_vectors(TITLES),
+            "skill": self._field_vectors(SKILLS),
+            "city": self._field_vectors(CITIES),
+            "industry": self._field_vectors(INDUSTRIES),
+        }
+
+    def _field_vectors(self, values: List[str]) -> np.ndarray:
+        return np.stack([self.embeddings.raw(v) for v in values])
+
+    def _choices(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        skills = np.argsort(rng.random((n, len(SKILLS))), axis=1)[:, :SKILLS_PER_JOB]
+        return {
+            "title": rng.integers(len(TITLES), size=n),
+            "skill": skills,
+            "city": rng.integers(len(CITIES), size=n),
+            "industry": rng.integers(len(INDUSTRIES), size=n),
+            "edu": rng.integers(len(EDUCATIONS), size=n),
+            "exp": rng.integers(len(EXPERIENCES), size=n),
+        }
+
+    def _chunks(self, n: int, chunk_size: int) -> Iterator[Tuple[int, int, np.random.Generator]]:
+        for chunk, start in enumerate(range(0, n, chunk_size)):
+            yield start, min(n, start + chunk_size), np.random.default_rng([self.seed, chunk])
+
+    def vectors(self, n: int, chunk_size: int = 100000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        返回 (jids int64[n], vectors float32[n, dim]), 向量已归一化
+        """
+        out = np.empty((n, self.dim), dtype=np.float32)
+        for start, end, rng in self._chunks(n, chunk_size):
+            c = self._choices(rng, end - start)
+            block = (
+                self._fields["title"][c["title"]]
+                + self._fields["skill"][c["skill"]].sum(axis=1)
+                + self._fields["city"][c["city"]]
+                + self._fields["industry"][c["industry"]]
+            )
+            scale = self.noise * np.linalg.norm(block, axis=1, keepdims=True) / np.sqrt(self.dim)
+            block += rng.standard_normal(block.shape).astype(np.float32) * scale
+            block /= np.linalg.norm(block, axis=1, keepdims=True)
+            out[start:end] = block
+        return np.arange(1, n + 1, dtype=np.int64), out
+
+    def jobs(self, n: int, chunk_size: int = 100000) -> Iterator[Dict[str, object]]:
+        """
+        逐条产出与 vectors(n) 同序的岗位字段, 字段名与 Job 模型一致
+        """
+        for start, end, rng in self._chunks(n, chunk_size):
+            c = self._choices(rng, end - start)
+            for i in range(end - start):
+                title = TITLES[c["title"][i]]
+                skills = " ".join(SKILLS[s] for s in c["skill"][i])
+                yield {
+                    "jid": start + i + 1,
+                    "job_title": title,
+                    "skill_requirements": skills,
+                    "job_description_requirements": f"{title} 熟悉 {skills}",
+                    "location": CITIES[c["city"][i]],
+                    "company_industry": INDUSTRIES[c["industry"][i]],
+                    "edu_requirement": EDUCATIONS[c["edu"][i]],
+                    "exp_requirement": EXPERIENCES[c["exp"][i]],
+                }
+
+    def queries(self, m: int, seed: int = 7) -> List[str]:
+        """
+        生成 m 条求职查询, 由岗位名、部分技能与城市组成
+        """
+        rng = np.random.default_rng([self.seed, seed, 1 << 20])
+        out: List[str] = []
+        for _ in range(m):
+            parts = [TITLES[rng.integers(len(TITLES))]]
+            n_skills = int(rng.integers(0, SKILLS_PER_JOB + 1))
+            parts.extend(SKILLS[s] for s in rng.choice(len(SKILLS), n_skills, replace=False))
+            if rng.random() < 0.7:
+                parts.append(CITIES[rng.integers(len(CITIES))])
+            out.append(" ".join(parts))
+        return out
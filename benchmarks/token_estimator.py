@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:58:03
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : token_estimator.py
+# @License : Apache-2.0
+# @Desc    : 字符类别 token 估算的校准与误差评估(对照 DeepSeek 分词器)
+
+"""
+用法(在项目根目录执行, 需 DeepSeek 的 tokenizer/tokenizer.json):
+    python -m benchmarks.token_estimator
+    python -m benchmarks.token_estimator --corpus chat_messages.jsonl --min-tokens 50
+    python -m benchmarks.token_estimator --dump-corpus benchmarks/data/token_corpus.jsonl
+
+语料默认为仓库中的 benchmarks/data/token_corpus.jsonl(项目提示词与合成岗位、求职查询拼成,
+由 --dump-corpus 生成, 保证校准结果可复现); --corpus 可指定导出的真实消息,
+.jsonl 每行取 content 字段, 其它文件每个非空行为一条。
+输出当前系数与最小二乘拟合系数下的相对误差分布, 以及两者的估算/精确计数耗时;
+会话总数的相对误差不超过单条最大相对误差, 据此给出 token_estimate_band 建议值,
+拟合系数写回 tokenizer/estimator.py 的 ESTIMATE_COEFFICIENTS
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.config import (
+    COMPRESS_SYSTEM_PROMPT,
+    MAIN_SYSTEM_PROMPT,
+    NAMING_SYSTEM_PROMPT,
+    PORTRAIT_SYSTEM_PROMPT,
+)
+from tokenizer.deepseek_tokenizer import _count_tokens
+from tokenizer.estimator import ESTIMATE_COEFFICIENTS, char_classes, estimate_token_count
+from .synthetic import SyntheticJobCorpus
+
+SAMPLE_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "token_corpus.jsonl")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="token 估算校准")
+    parser.add_argument("--corpus", action="append", default=[], help="语料文件, 可多次指定, 默认为样例语料")
+    parser.add_argument("--jobs", type=int, default=200, help="--dump-corpus 生成语料时的合成岗位数")
+    parser.add_argument("--dump-corpus", default=None, help="把合成语料写为 .jsonl 后退出, 不需要分词器")
+    parser.add_argument("--min-tokens", type=int, default=20, help="统计误差时忽略更短的文本")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="结果 JSON 路径")
+    return parser.parse_args(argv)
+
+
+def _read_corpus(path: str) -> List[str]:
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            texts.append(json.loads(line)["content"] if path.endswith(".jsonl") else line)
+    return texts
+
+
+def default_corpus(n_jobs: int, seed: int) -> List[str]:
+    """
+    提示词 + 合成岗位描述 + 求职查询, 以及模拟的工具调用消息, 覆盖中英文混排与 JSON
+    """
+    corpus = SyntheticJobCorpus(seed=seed)
+    texts = [MAIN_SYSTEM_PROMPT, PORTRAIT_SYSTEM_PROMPT, COMPRESS_SYSTEM_PROMPT, NAMING_SYSTEM_PROMPT]
+    jobs = list(corpus.jobs(n_jobs))
+    texts.extend(json.dumps(job, ensure_ascii=False) for job in jobs)
+    texts.extend(f"{job['job_title']}，{job['job_description_requirements']}" for job in jobs)
+    for query in corpus.queries(n_jobs // 4, seed=seed):
+        texts.append(f"人物画像: {{}}\n用户问题: 我想找{query}相关的工作")
+        texts.append(
+            "[TOOL_CALL]\n```json\n"
+            + json.dumps(
+                {"tool_name": "job_search_topn", "tool_params": {"query": query, "topn": 5}},
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n```"
+        )
+    # 按 20 条拼成长文本, 近似一段多轮对话
+    texts.extend("\n".join(texts[i : i + 20]) for i in range(4, len(texts), 20))
+    return texts
+
+
+def fit(features: np.ndarray, exact: np.ndarray) -> Tuple[float, ...]:
+    """
+    按相对误差加权的无截距最小二乘(每行除以精确 token 数), 系数截断为非负
+    """
+    coef, *_ = np.linalg.lstsq(features / exact[:, None], np.ones_like(exact), rcond=None)
+    return tuple(float(max(c, 0.0)) for c in coef)
+
+
+def error_stats(estimates: np.ndarray, exact: np.ndarray) -> Dict[str, float]:
+    rel = (estimates - exact) / exact
+    abs_rel = np.abs(rel)
+    return {
+        "mean": float(rel.mean()),
+        "p50_abs": float(np.percentile(abs_rel, 50)),
+        "p99_abs": float(np.percentile(abs_rel, 99)),
+        "max_abs": float(abs_rel.max()),
+        "total": float((estimates.sum() - exact.sum()) / exact.sum()),
+    }
+
+
+def dump_corpus(path: str, n_jobs: int, seed: int) -> int:
+    texts = default_corpus(n_jobs, seed)
+    if directory := os.path.dirname(path):
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for text in texts:
+            f.write(json.dumps({"content": text}, ensure_ascii=False) + "\n")
+    return len(texts)
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    texts = []
+    for path in args.corpus or [SAMPLE_CORPUS]:
+        texts.extend(_read_corpus(path))
+
+    start = time.perf_counter()
+    exact = np.asarray(_count_tokens(texts), dtype=np.float64)
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        estimate_token_count(text)
+    estimate_seconds = time.perf_counter() - start
+
+    features = np.asarray([char_classes(text) for text in texts], dtype=np.float64)
+    mask = exact >= args.min_tokens
+    fitted = fit(features[mask], exact[mask])
+
+    report = {
+        "corpus": args.corpus or [os.path.relpath(SAMPLE_CORPUS)],
+        "texts": len(texts),
+        "texts_evaluated": int(mask.sum()),
+        "chars": int(sum(len(t) for t in texts)),
+        "tokens": int(exact.sum()),
+        "exact_seconds": exact_seconds,
+        "estimate_seconds": estimate_seconds,
+        "current": {
+            "coefficients": list(ESTIMATE_COEFFICIENTS),
+            "error": error_stats(features[mask] @ np.asarray(ESTIMATE_COEFFICIENTS), exact[mask]),
+        },
+        "fitted": {
+            "coefficients": list(fitted),
+            "error": error_stats(features[mask] @ np.asarray(fitted), exact[mask]),
+        },
+    }
+    # 误差带取单条最大相对误差并留 10% 余量
+    report["suggested_band"] = round(report["fitted"]["error"]["max_abs"] * 1.1, 3)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.dump_corpus:
+        count = dump_corpus(args.dump_corpus, args.jobs, args.seed)
+        print(f"{count} texts written to {args.dump_corpus}")
+        return
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"token_estimator-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    report = run(args)
+    report["created_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if directory := os.path.dirname(output):
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:24:50
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : tool_call_bench.py
+# @License : Apache-2.0
+# @Desc    : [TOOL_CALL] 流式解析基准(增量解析 vs 整段缓冲后反复 json.loads)
+
+"""
+用法(在项目根目录执行):
+    python -m benchmarks.tool_call_bench --sizes 1000,10000,100000 --chunk 4
+
+对不同长度的工具调用负载, 按固定块长模拟模型流式输出, 比较:
+    legacy: 原 event_generator 的做法, 每来一块就对整个缓冲区 json.loads
+    incremental: ToolCallParser
+并统计普通回复首次下发前需要缓冲的字符数(首字延迟的代理指标)
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Optional
+
+from services.tool_call import ToolCallParser
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="[TOOL_CALL] 流式解析基准")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000, 100000])
+    parser.add_argument("--chunk", type=int, default=4, help="每块字符数, 近似模型单个 token")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="结果 JSON 路径")
+    return parser.parse_args(argv)
+
+
+def split_chunks(text: str, size: int) -> List[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def tool_call_chunks(size: int, chunk: int) -> List[str]:
+    """
+    旧实现要求前缀恰好凑满 12 个字符并丢弃其后的一块, 按其能正确解析的切分方式生成,
+    两种实现使用同一组输入
+    """
+    query = ("3年React前端开发 上海 可接受全栈转型 " * (size // 20 + 1))[:size]
+    payload = {
+        "tool_name": "job_search_topn",
+        "tool_params": {"query": query, "topn": 5, "filters": {"location": "上海"}},
+    }
+    body = json.dumps(payload, ensure_ascii=False, indent=2)
+    return ["[TOOL_CALL]\n", "```", *split_chunks(f"json\n{body}\n```", chunk)]
+
+
+def legacy_parse(chunks: List[str]) -> Optional[dict]:
+    # 与改造前 api/sessions.py 中的逻辑一致
+    head = ""
+    tool_buffer = ""
+    in_tool_call = False
+    for chunk in chunks:
+        if not in_tool_call:
+            if len(head) < 12:
+                head += chunk
+                continue
+            if head.startswith("[TOOL_CALL]"):
+                in_tool_call = True
+                continue
+            return None
+        tool_buffer += chunk
+        json_str = tool_buffer.strip("`")
+        try:
+            if json_str.startswith("json"):
+                json_str = json_str[4:].strip()
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def incremental_parse(chunks: List[str]) -> Optional[dict]:
+    parser = ToolCallParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            return parser.tool_call
+    parser.finish()
+    return parser.tool_call
+
+
+def first_text_offset(chunks: List[str], incremental: bool) -> int:
+    """
+    普通回复在第一次下发前已接收的字符数
+    """
+    received = 0
+    if incremental:
+        parser = ToolCallParser()
+        for chunk in chunks:
+            received += len(chunk)
+            if parser.feed(chunk):
+                return received
+        return received
+    head = ""
+    for chunk in chunks:
+        received += len(chunk)
+        if len(head) < 12:
+            head += chunk
+            continue
+        return received
+    return received
+
+
+def _best_of(fn, chunks: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    results = []
+    for size in args.sizes:
+        chunks = tool_call_chunks(size, args.chunk)
+        legacy = legacy_parse(chunks)
+        incremental = incremental_parse(chunks)
+        row = {
+            "payload_chars": size,
+            "chunks": len(chunks),
+            "legacy_seconds": _best_of(legacy_parse, chunks, args.repeat),
+            "incremental_seconds": _best_of(incremental_parse, chunks, args.repeat),
+            "legacy_parsed": legacy is not None,
+            "incremental_parsed": incremental is not None,
+        }
+        row["speedup"] = (
+            row["legacy_seconds"] / row["incremental_seconds"]
+            if row["incremental_seconds"]
+            else None
+        )
+        results.append(row)
+        print(json.dumps(row, ensure_ascii=False))
+    reply = split_chunks("好的，根据你的情况，我先问几个问题。", args.chunk)
+    first_text = {
+        "legacy_chars": first_text_offset(reply, incremental=False),
+        "incremental_chars": first_text_offset(reply, incremental=True),
+    }
+    print(json.dumps({"first_text": first_text}, ensure_ascii=False))
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "args": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+        "first_text": first_text,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"tool_call-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    report = run(args)
+    if directory := os.path.dirname(output):
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
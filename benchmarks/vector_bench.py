@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:21:05
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : vector_bench.py
+# @License : Apache-2.0
+# @Desc    : JobVectorService 检索基准(构建耗时 / 磁盘与内存占用 / 延迟 / 并发 QPS / recall@k)
+
+"""
+用法(在项目根目录执行):
+    python -m benchmarks.vector_bench --sizes 10000,100000 --types flat,ivf_flat,hnsw
+    python -m benchmarks.vector_bench --sizes 1000000 --types ivf_pq --nprobe 8,16,64
+
+每个 (规模, 索引类型) 先用 build_index 构建基线并经 SegmentedIndexStore 落盘,
+再按生产方式由 JobVectorService 加载, 通过 search_ids_async 检索;
+recall@k 以同一批向量上的精确 Flat 检索结果为基准。结果写入 JSON, 便于跨版本对比
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from config.config import Config
+from MCP.index_factory import INDEX_TYPES, IndexSpec, build_index, index_type_of, save_base_index
+from MCP.index_store import SegmentedIndexStore
+from .synthetic import SyntheticJobCorpus
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JobVectorService 检索基准")
+    parser.add_argument("--sizes", type=_int_list, default=[10000, 100000, 1000000])
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--nprobe", type=_int_list, default=[Config.vector_nprobe])
+    parser.add_argument("--ef-search", type=_int_list, default=[Config.vector_ef_search])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-mmap", action="store_true", help="基线整体读入内存而非内存映射")
+    parser.add_argument("--work-dir", default=None, help="索引临时目录, 默认系统临时目录")
+    parser.add_argument("--keep", action="store_true", help="保留生成的索引目录")
+    parser.add_argument("--output", default=None, help="结果 JSON 路径")
+    args = parser.parse_args(argv)
+    args.types = [t.strip() for t in args.types.split(",") if t.strip()]
+    for index_type in args.types:
+        if index_type not in INDEX_TYPES:
+            parser.error(f"unknown index type: {index_type}")
+    return args
+
+
+def _rss_bytes() -> Optional[int]:
+    # 仅 Linux 可读取当前 RSS, 其它平台不统计内存
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _rss_delta(before: Optional[int]) -> Optional[int]:
+    after = _rss_bytes()
+    return None if before is None or after is None else after - before
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _environment() -> Dict[str, object]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "faiss": getattr(faiss, "__version__", None),
+        "numpy": np.__version__,
+        "git_commit": _git_commit(),
+    }
+
+
+def _configure(index_type: str, mmap: bool) -> None:
+    # 只测检索链路: 关闭选主、对账、embedding 缓存及 Redis 缓存
+    Config.vector_index_type = index_type
+    Config.vector_index_min_train_size = 0
+    Config.vector_index_mmap = mmap
+    Config.vector_leader_backend = "none"
+    Config.vector_reconcile_interval = 0
+    Config.embedding_cache_enabled = False
+    Config.query_cache_redis = False
+    Config.job_cache_redis = False
+
+
+def ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """
+    精确 L2 检索的 top-k 下标(jid = 下标 + 1)
+    """
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    _, labels = index.search(queries, k)
+    return labels + 1
+
+
+def recall_at_k(results: List[List[int]], truth: np.ndarray, k: int) -> float:
+    hits = [len(set(row[:k]) & set(truth[i, :k].tolist())) for i, row in enumerate(results)]
+    return float(np.mean(hits)) / k if hits else 0.0
+
+
+async def _measure(svc, queries: List[str], k: int, concurrency: int) -> Dict[str, object]:
+    """
+    先完整跑一遍预热查询向量缓存与 mmap 页, 之后顺序测延迟、并发测 QPS
+    延迟包含服务内完整链路: 查询向量缓存 + 微批执行器 + FAISS 多层检索与合并
+    """
+    for query in queries:
+        await svc.search_ids_async(query, k, mode="vector")
+
+    latencies: List[float] = []
+    results: List[List[int]] = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = await svc.search_ids_async(query, k, mode="vector")
+        latencies.append(time.perf_counter() - start)
+        results.append([jid for jid, _ in hits])
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(query: str) -> None:
+        async with semaphore:
+            await svc.search_ids_async(query, k, mode="vector")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(q) for q in queries))
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.asarray(latencies) * 1000
+    return {
+        "latency_ms": {
+            "mean": float(latency_ms.mean()),
+            "p50": float(np.percentile(latency_ms, 50)),
+            "p99": float(np.percentile(latency_ms, 99)),
+        },
+        "qps": len(queries) / elapsed if elapsed else None,
+        "results": results,
+    }
+
+
+def _param_grid(index_type: str, args: argparse.Namespace) -> List[Dict[str, int]]:
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return [{"nprobe": v} for v in args.nprobe]
+    if index_type == "hnsw":
+        return [{"ef_search": v} for v in args.ef_search]
+    return [{}]
+
+
+async def bench_index(
+    corpus: SyntheticJobCorpus,
+    jids: np.ndarray,
+    vectors: np.ndarray,
+    queries: List[str],
+    truth: np.ndarray,
+    index_type: str,
+    args: argparse.Namespace,
+) -> List[Dict[str, object]]:
+    from MCP.vector_service import JobVectorService
+
+    _configure(index_type, mmap=not args.no_mmap)
+    spec = replace(IndexSpec.from_config(), index_type=index_type, min_train_size=0)
+    index_dir = os.path.join(args.work_dir, f"{len(jids)}-{index_type}")
+    shutil.rmtree(index_dir, ignore_errors=True)
+
+    gc.collect()
+    start = time.perf_counter()
+    index = build_index(spec, vectors, jids)
+    build_seconds = time.perf_counter() - start
+    built_type = index_type_of(index)
+    store = SegmentedIndexStore(index_dir)
+    store.commit_base(0, lambda path: save_base_index(index, path))
+    disk_bytes = _dir_size(store.base_path)
+    del index, store
+    gc.collect()
+
+    rss_before = _rss_bytes()
+    svc = JobVectorService(index_dir, "http://127.0.0.1", "none", "bench-hash")
+    rss_load = _rss_delta(rss_before)
+    svc.embedding = corpus.embeddings
+
+    rows: List[Dict[str, object]] = []
+    try:
+        for params in _param_grid(built_type, args):
+            svc.set_search_params(**params)
+            measured = await _measure(svc, queries, args.k, args.concurrency)
+            row = {
+                "n": int(len(jids)),
+                "index_type": built_type,
+                "params": params,
+                "spec": asdict(spec),
+                "build_seconds": build_seconds,
+                "disk_bytes": disk_bytes,
+                "rss_load_bytes": rss_load,
+                "rss_after_search_bytes": _rss_delta(rss_before),
+                "latency_ms": measured["latency_ms"],
+                "qps": measured["qps"],
+                f"recall_at_{args.k}": recall_at_k(measured["results"], truth, args.k),
+            }
+            rows.append(row)
+            print(json.dumps(row, ensure_ascii=False))
+    finally:
+        await svc.close()
+        del svc
+        gc.collect()
+        if not args.keep:
+            shutil.rmtree(index_dir, ignore_errors=True)
+    return rows
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    corpus = SyntheticJobCorpus(dim=args.dim, seed=args.seed)
+    queries = corpus.queries(args.queries)
+    query_vectors = np.asarray(corpus.embeddings.embed_documents(queries), dtype=np.float32)
+    results: List[Dict[str, object]] = []
+    for n in args.sizes:
+        start = time.perf_counter()
+        jids, vectors = corpus.vectors(n)
+        print(f"corpus generated: n={n}, seconds={time.perf_counter() - start:.2f}")
+        truth = ground_truth(vectors, query_vectors, args.k)
+        for index_type in args.types:
+            results.extend(
+                await bench_index(corpus, jids, vectors, queries, truth, index_type, args)
+            )
+        del jids, vectors
+        gc.collect()
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "work_dir")},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    work_dir = args.work_dir
+    args.work_dir = work_dir or tempfile.mkdtemp(prefix="vector-bench-")
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"vector-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if work_dir is None and not args.keep:
+            shutil.rmtree(args.work_dir, ignore_errors=True)
+    if directory := os.path.dirname(output):
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
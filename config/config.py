@@ -14,6 +14,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class Config:
     development: bool = os.getenv("development", False)
@@ -70,12 +77,92 @@ class Config:
         os.getenv("access_token_expires_minutes", 15)
     )
     refresh_token_expires_days: int = int(os.getenv("refresh_token_expires_days", 7))
+    # 管理接口(/api/admin)令牌, 请求头 X-Admin-Token, 为空时关闭管理接口
+    admin_token: str = os.getenv("admin_token", "")
     embedding_api_base_url: str = os.getenv("embedding_api_base_url")
     embedding_api_key: str = os.getenv("embedding_api_key")
     embedding_model_name: str = os.getenv("embedding_model_name")
+    # 批量 embedding 配置
+    embedding_batch_size: int = int(os.getenv("embedding_batch_size", 64))
+    embedding_max_concurrency: int = int(os.getenv("embedding_max_concurrency", 4))
+    embedding_max_retries: int = int(os.getenv("embedding_max_retries", 3))
+    embedding_retry_backoff: float = float(os.getenv("embedding_retry_backoff", 0.5))
     faiss_index_dir: str = os.getenv(
         "faiss_index_dir", os.path.join("data", "faiss_jobs")
     )
+    # 文档向量持久化缓存(按模型名 + 文本哈希), 重建索引时跳过文本未变的岗位
+    embedding_cache_enabled: bool = _env_bool("embedding_cache_enabled", True)
+    embedding_cache_path: str = os.getenv(
+        "embedding_cache_path", os.path.join("data", "embedding_cache.sqlite3")
+    )
+    # 查询向量缓存配置
+    query_cache_size: int = int(os.getenv("query_cache_size", 2048))
+    query_cache_ttl: float = float(os.getenv("query_cache_ttl", 3600))
+    query_cache_redis: bool = _env_bool("query_cache_redis", False)
+    # 向量检索执行器配置: 有空闲检索线程时查询立即执行, 线程全忙时才按窗口攒批
+    vector_search_window_ms: float = float(os.getenv("vector_search_window_ms", 2))
+    vector_search_max_batch: int = int(os.getenv("vector_search_max_batch", 32))
+    vector_search_threads: int = int(os.getenv("vector_search_threads", 2))
+    # 增量段数量达到该值时后台折叠为新的基线快照
+    vector_compact_segments: int = int(os.getenv("vector_compact_segments", 64))
+    # 进程内增量层数超过该值时合并为一层, 控制单次检索遍历的层数
+    vector_max_delta_tiers: int = int(os.getenv("vector_max_delta_tiers", 8))
+    # 保留的 compaction 前快照个数(含磁盘上的旧基线), 用于回滚
+    vector_snapshot_history: int = int(os.getenv("vector_snapshot_history", 2))
+    # 多 worker 索引写入协调: redis(租约锁, 可多机) / file(文件锁, 单机) / none(仅单 worker)
+    vector_leader_backend: str = os.getenv("vector_leader_backend", "redis")
+    # 写入者租约时长(秒)
+    vector_leader_ttl: float = float(os.getenv("vector_leader_ttl", 15))
+    # follower 检查索引版本号的间隔(秒)
+    vector_follower_poll_interval: float = float(
+        os.getenv("vector_follower_poll_interval", 1)
+    )
+    # 向量索引类型: flat / ivf_flat / ivf_pq / hnsw
+    vector_index_type: str = os.getenv("vector_index_type", "flat")
+    vector_index_min_train_size: int = int(
+        os.getenv("vector_index_min_train_size", 10000)
+    )
+    vector_ivf_nlist: int = int(os.getenv("vector_ivf_nlist", 0))
+    vector_pq_m: int = int(os.getenv("vector_pq_m", 16))
+    vector_pq_nbits: int = int(os.getenv("vector_pq_nbits", 8))
+    vector_hnsw_m: int = int(os.getenv("vector_hnsw_m", 32))
+    vector_hnsw_ef_construction: int = int(
+        os.getenv("vector_hnsw_ef_construction", 200)
+    )
+    vector_nprobe: int = int(os.getenv("vector_nprobe", 16))
+    vector_ef_search: int = int(os.getenv("vector_ef_search", 64))
+    # 以只读内存映射方式加载基线索引, 同机 worker 共享 page cache
+    vector_index_mmap: bool = _env_bool("vector_index_mmap", True)
+    # 启动同步时每页读取的岗位数
+    vector_sync_page_size: int = int(os.getenv("vector_sync_page_size", 1000))
+    # 索引与 MySQL 对账间隔(秒), 0 关闭
+    vector_reconcile_interval: float = float(
+        os.getenv("vector_reconcile_interval", 3600)
+    )
+    # 岗位检索模式: vector 纯向量(默认, 分数为 L2 距离) / hybrid 向量 + BM25 关键词按 RRF 融合(需显式开启, 分数为融合分)
+    vector_search_mode: str = os.getenv("vector_search_mode", "vector")
+    # BM25 参数
+    lexical_bm25_k1: float = float(os.getenv("lexical_bm25_k1", 1.2))
+    lexical_bm25_b: float = float(os.getenv("lexical_bm25_b", 0.75))
+    # RRF 融合常数, 越大各路名次差异的影响越平缓
+    hybrid_rrf_k: int = int(os.getenv("hybrid_rrf_k", 60))
+
+    # 岗位检索结果回填缓存配置
+    job_cache_size: int = int(os.getenv("job_cache_size", 10000))
+    job_cache_ttl: float = float(os.getenv("job_cache_ttl", 300))
+    job_cache_redis: bool = _env_bool("job_cache_redis", False)
+    job_cache_redis_ttl: int = int(os.getenv("job_cache_redis_ttl", 86400))
+    # 启动时预热最近返回过的岗位数
+    job_cache_warm_size: int = int(os.getenv("job_cache_warm_size", 1000))
+
+    # 聊天流式输出合并: 首块立即下发, 之后累计到字符数或等待超过毫秒数时合并为一帧, 任一为 0 关闭
+    chat_stream_coalesce_chars: int = int(os.getenv("chat_stream_coalesce_chars", 32))
+    chat_stream_coalesce_ms: float = float(os.getenv("chat_stream_coalesce_ms", 30))
+    # 会话上下文超过该 token 数时压缩(chat_doubao 支持 256k 上下文)
+    context_token_limit: int = int(os.getenv("context_token_limit", 200000))
+    # 无 token 台账时的估算误差带, 估算值落在上限 ±band 内时才用分词器精确计数;
+    # <=0 不使用估算, 估算系数经 benchmarks.token_estimator 校准前保持默认 0
+    token_estimate_band: float = float(os.getenv("token_estimate_band", 0))
 
 
 # 人物画像系统提示词
@@ -184,17 +271,20 @@ MAIN_SYSTEM_PROMPT = """
 可用工具说明
 =====================
 工具名称：job_search_topn
-功能：基于查询字符串搜索 topn 个岗位，并返回向量匹配评分
+功能：基于查询字符串搜索 topn 个岗位，结果已按匹配度从高到低排序
 
 参数说明：
 - query (str)：岗位匹配查询内容，基于完整的用户画像构建
 - topn (int)：返回岗位数量上限，建议3～10
+- filters (dict，可选)：硬性筛选条件，仅在用户明确限定时填写，否则省略
+  可用键：location（工作地点）、edu_requirement（学历要求）、exp_requirement（经验要求）、company_type（公司类型）、company_industry（公司行业）
+  值为字符串或字符串列表，同一键的多个值为“或”，不同键之间为“且”，例如 {"location": ["上海", "杭州"]}
 
 返回内容：
 - List[Dict]，每个 Dict 包含岗位信息
               {
                   "jid": 岗位 id,
-                  "score": L2 向量匹配分数,
+                  "score": 匹配分数（仅用于排序参考）,
                   "job_title": 岗位标题,
                   "job_description_requirements": 岗位描述要求,
                   "company_name": 公司名称,
@@ -307,7 +397,8 @@ MAIN_SYSTEM_PROMPT = """
   "tool_name": "job_search_topn",
   "tool_params": {
     "query": "基于完整画像构建的综合匹配查询内容",  // 综合考虑用户的所有信息，构建匹配查询
-    "topn": 5 // 整数,即匹配的岗位数量
+    "topn": 5, // 整数,即匹配的岗位数量
+    "filters": {"location": "上海"} // 可选,用户明确限定的硬性条件,没有则省略该字段
   }
 }
 ```
@@ -17,7 +17,7 @@ from services.smtp import connect_smtp, disconnect_smtp
 from starlette.middleware.base import BaseHTTPMiddleware
 from services.telemetry import init_sentry
 from services.llm import init_llm
-from MCP.vector_service import init_job_vector_service
+from MCP.vector_service import init_job_vector_service, close_job_vector_service
 
 # from services.job import start_import_jobs
 
@@ -42,6 +42,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await close_job_vector_service()
+    print("Vector service closed")
     await shutdown()
     print("Database shutdown")
     await disconnect_smtp()
@@ -9,7 +9,7 @@ import contextlib
 import json
 import re
 from datetime import datetime, timezone
-from typing import List, Dict, AsyncGenerator, AsyncIterator, Any, Tuple
+from typing import List, Dict, AsyncGenerator, AsyncIterator, Any, Optional, Tuple
 
 from config import Config
 from config.config import (
@@ -20,7 +20,14 @@ from config.config import (
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionChunk, ChatCompletion
 from MCP import vector_service
+from MCP.attribute_index import FILTER_FIELDS
 from services.telemetry import capture_exception
+from services.portrait_cache import (
+    bump_portrait_version,
+    get_cached_portrait,
+    set_cached_portrait,
+)
+from utils.database import redis_client
 
 from neo4j import AsyncSession
 
@@ -77,13 +84,17 @@ async def chat_deepseek(
         yield chunk.choices[0].delta.content
 
 
-async def job_search_topn(query: str, topn: int) -> List[Dict]:
+async def job_search_topn(
+    query: str, topn: int, filters: Optional[Dict[str, Any]] = None
+) -> List[Dict]:
     """
     基于查询字符串搜索topn个岗位
 
     Args:
         query (str): 搜索查询字符串
         topn (int): 返回的岗位数量
+        filters (Optional[Dict[str, Any]]): 结构化过滤条件, 键为 location / edu_requirement /
+            exp_requirement / company_type / company_industry, 值为字符串或字符串列表
 
     Returns:
         List[Dict]: 包含岗位信息的字典列表
@@ -92,7 +103,7 @@ async def job_search_topn(query: str, topn: int) -> List[Dict]:
         [
             {
                 "jid": 岗位id,
-                "score": l2分数,
+                "score": 匹配分数(vector 模式为 l2 距离, hybrid 模式为 RRF 融合分),
                 "job_title": 岗位标题,
                 "job_description_requirements": 岗位描述要求,
                 "company_name": 公司名称,
@@ -106,11 +117,26 @@ async def job_search_topn(query: str, topn: int) -> List[Dict]:
             ...
         ]
     """
-    print(f"job_search_topn: query={query}, topn={topn}")
+    print(f"job_search_topn: query={query}, topn={topn}, filters={filters}")
     print(f"job_vector_service is None: {vector_service.job_vector_service is None}")
     if not vector_service.job_vector_service:
         return []
-    return await vector_service.job_vector_service.search_async(query, topn)
+    # 过滤条件由模型生成, 忽略不支持的字段而不是让整次检索失败
+    if isinstance(filters, dict):
+        filters = {k: v for k, v in filters.items() if k in FILTER_FIELDS}
+    else:
+        filters = None
+    try:
+        return await vector_service.job_vector_service.search_async(
+            query, topn, filters=filters
+        )
+    except (ValueError, TypeError) as e:
+        # 过滤条件无法解析时退回不带过滤的检索, 不让一次工具调用中断聊天流
+        capture_exception(e)
+        print(f"job_search_topn: invalid filters {filters}: {e}")
+        if not filters:
+            raise
+        return await vector_service.job_vector_service.search_async(query, topn)
 
 
 def _to_jsonable(value: Any) -> Any:
@@ -248,31 +274,51 @@ async def load_portrait_data(
     return portrait_node_id, {"nodes": list(nodes.values()), "edges": edge_list}
 
 
+def render_portrait(graph: Dict[str, Any]) -> str:
+    return json.dumps(graph, ensure_ascii=False)
+
+
+async def load_portrait_text(neo4j_session: AsyncSession, session_id: str) -> str:
+    """
+    读取供聊天使用的画像文本, 优先命中 Redis 缓存;
+    画像只在后台 save_nodes_edges 写入时变化, 写入会递增版本号使缓存失效
+    """
+    version, text = await get_cached_portrait(redis_client, session_id)
+    if text is not None:
+        return text
+    _, graph = await load_portrait_data(neo4j_session, session_id)
+    text = render_portrait(graph)
+    await set_cached_portrait(redis_client, session_id, version, text)
+    return text
+
+
 async def save_nodes_edges(
     neo4j_session: AsyncSession, session_id: str, nodes_edges: Dict[str, Any]
 ):
     """
     写入节点和边，保留边的完整属性。
     """
-    safe_label = "S_" + session_id.replace("-", "_")
+    try:
+        await _write_nodes_edges(neo4j_session, session_id, nodes_edges)
+    finally:
+        # 即使中途失败也可能已写入部分数据, 一律使画像缓存失效
+        await bump_portrait_version(redis_client, session_id)
+
 
+def _group_nodes_edges(
+    nodes_edges: Dict[str, Any],
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+    """
+    节点按清洗后的标签、边按清洗后的关系类型分组, 每组写入一条 UNWIND 语句
+    """
+    node_rows: Dict[str, List[Dict[str, Any]]] = {}
     for node in nodes_edges.get("nodes", []):
-        node_id = node["id"]
-        raw_label = node["label"]
-        label = _sanitize_label(raw_label)
         props = (node.get("properties", {}) or {}).copy()
         for reserved in ("session_id", "id", "portrait_id"):
             props.pop(reserved, None)
-        cypher = (
-            f"MERGE (n:{label}:{safe_label} {{portrait_id: $id}}) "
-            f"SET n.session_id = $session_id"
-        )
-        if props_str := ", ".join(f"{k}: ${k}" for k in props):
-            cypher += f", n += {{{props_str}}}"
-        result = await neo4j_session.run(
-            cypher, id=node_id, session_id=session_id, **props
+        node_rows.setdefault(_sanitize_label(node["label"]), []).append(
+            {"id": node["id"], "props": props}
         )
-        await result.consume()
 
     edges_dict: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
     for e in nodes_edges.get("edges", []):
@@ -283,20 +329,51 @@ async def save_nodes_edges(
         else:
             edges_dict[key] = props
 
+    edge_rows: Dict[str, List[Dict[str, Any]]] = {}
     for (source, target, rel_type), props in edges_dict.items():
-        rel_type_cypher = _sanitize_rel_type(rel_type)
         props = (props or {}).copy()
         for reserved in ("source", "target"):
             props.pop(reserved, None)
-        props_str = ", ".join(f"{k}: ${k}" for k in props)
-        cypher = f"""
-        MATCH (a:{safe_label} {{portrait_id: $source}}), (b:{safe_label} {{portrait_id: $target}})
-        MERGE (a)-[r:{rel_type_cypher}]->(b)
-        """
-        if props_str:
-            cypher += f"SET r += {{{props_str}}}"
-        result = await neo4j_session.run(cypher, source=source, target=target, **props)
-        await result.consume()
+        edge_rows.setdefault(_sanitize_rel_type(rel_type), []).append(
+            {"source": source, "target": target, "props": props}
+        )
+    return node_rows, edge_rows
+
+
+async def _write_nodes_edges(
+    neo4j_session: AsyncSession, session_id: str, nodes_edges: Dict[str, Any]
+):
+    safe_label = "S_" + session_id.replace("-", "_")
+    node_rows, edge_rows = _group_nodes_edges(nodes_edges)
+    if not node_rows and not edge_rows:
+        return
+
+    async def _write(tx):
+        # 同一事务内先写节点再写边, 失败整体回滚, 不会留下半张图
+        for label, rows in node_rows.items():
+            result = await tx.run(
+                f"""
+                UNWIND $rows AS row
+                MERGE (n:{label}:{safe_label} {{portrait_id: row.id}})
+                SET n.session_id = $session_id, n += row.props
+                """,
+                rows=rows,
+                session_id=session_id,
+            )
+            await result.consume()
+        for rel_type, rows in edge_rows.items():
+            result = await tx.run(
+                f"""
+                UNWIND $rows AS row
+                MATCH (a:{safe_label} {{portrait_id: row.source}}), (b:{safe_label} {{portrait_id: row.target}})
+                MERGE (a)-[r:{rel_type}]->(b)
+                SET r += row.props
+                """,
+                rows=rows,
+            )
+            await result.consume()
+
+    await neo4j_session.execute_write(_write)
 
 
 async def generate_character_portrait(
@@ -344,38 +421,98 @@ async def generate_character_portrait(
     if not new_graph.get("nodes", []) and not new_graph.get("edges", []):
         return existing_graph
 
+    merged_graph, changes, skipped = _merge_graph(existing_graph, new_graph)
+    if changes["nodes"] or changes["edges"]:
+        await save_nodes_edges(neo4j_session, session_id, changes)
+    print(
+        f"portrait {session_id}: wrote {len(changes['nodes'])} nodes, "
+        f"{len(changes['edges'])} edges; skipped {skipped['nodes']} nodes, "
+        f"{skipped['edges']} edges unchanged"
+    )
+    return merged_graph
+
+
+def _changed_props(
+    base: Dict[str, Any], new: Dict[str, Any], reserved: Tuple[str, ...]
+) -> Dict[str, Any]:
+    return {
+        k: v for k, v in new.items() if k not in reserved and base.get(k) != v
+    }
+
+
+def _merge_graph(
+    existing_graph: Dict[str, Any], new_graph: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, int]]:
+    """
+    把模型输出的增量图谱合并进已有图谱, 同时得到需要写入的变更集:
+    新节点 / 新边整条写入, 已有节点 / 边只写入值发生变化的属性, 完全未变的跳过
+    已有边的类型为清洗后的关系类型, 比较时新边类型同样先清洗
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, int]]: (合并后的图谱, 变更集, 未写入的节点/边数)
+    """
     nodes_by_id = {n["id"]: n for n in existing_graph.get("nodes", [])}
+    changed_nodes: Dict[str, Dict[str, Any]] = {}
     for n in new_graph.get("nodes", []):
+        new_props = n.get("properties", {}) or {}
         if n["id"] not in nodes_by_id:
             nodes_by_id[n["id"]] = n
+            changed_nodes[n["id"]] = {
+                "id": n["id"],
+                "label": n["label"],
+                "properties": dict(new_props),
+            }
+            continue
+        base = nodes_by_id[n["id"]]
+        base_props = base.get("properties", {}) or {}
+        diff = _changed_props(base_props, new_props, ("session_id", "id", "portrait_id"))
+        base_props.update(new_props)
+        base["properties"] = base_props
+        if not diff:
+            continue
+        if n["id"] in changed_nodes:
+            changed_nodes[n["id"]]["properties"].update(diff)
         else:
-            base_props = nodes_by_id[n["id"]].get("properties", {}) or {}
-            new_props = n.get("properties", {}) or {}
-            base_props.update(new_props)
-            nodes_by_id[n["id"]]["properties"] = base_props
+            # 沿用已有节点的标签, 保证 MERGE 命中同一节点
+            changed_nodes[n["id"]] = {
+                "id": n["id"],
+                "label": base["label"],
+                "properties": diff,
+            }
 
     edges_map: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
     for e in existing_graph.get("edges", []):
         key = (e["source"], e["target"], e["type"])
         edges_map[key] = e.get("properties", {}) or {}
+    changed_edges: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
     for e in new_graph.get("edges", []):
-        key = (e["source"], e["target"], e["type"])
+        key = (e["source"], e["target"], _sanitize_rel_type(e["type"]))
         props = e.get("properties", {}) or {}
-        if key in edges_map:
-            edges_map[key].update(props)
-        else:
-            edges_map[key] = props
+        if key not in edges_map:
+            edges_map[key] = dict(props)
+            changed_edges[key] = dict(props)
+            continue
+        diff = _changed_props(edges_map[key], props, ("source", "target"))
+        edges_map[key].update(props)
+        if diff:
+            changed_edges.setdefault(key, {}).update(diff)
+
+    def _edge_list(edges):
+        return [
+            {"source": s, "target": t, "type": ty, "properties": props}
+            for (s, t, ty), props in edges.items()
+        ]
 
     merged_graph = {
         "nodes": list(nodes_by_id.values()),
-        "edges": [
-            {"source": s, "target": t, "type": ty, "properties": props}
-            for (s, t, ty), props in edges_map.items()
-        ],
+        "edges": _edge_list(edges_map),
     }
-
-    await save_nodes_edges(neo4j_session, session_id, merged_graph)
-    return merged_graph
+    changes = {"nodes": list(changed_nodes.values()), "edges": _edge_list(changed_edges)}
+    # 相比整图重写省去的写入数
+    skipped = {
+        "nodes": len(nodes_by_id) - len(changed_nodes),
+        "edges": len(edges_map) - len(changed_edges),
+    }
+    return merged_graph, changes, skipped
 
 
 async def compress_message(user_messages: List[Dict[str, str]]) -> str:
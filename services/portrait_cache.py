@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:21:37
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : portrait_cache.py
+# @License : Apache-2.0
+# @Desc    : 人物画像读缓存(Redis, 按会话画像版本号失效)
+
+from typing import Optional, Tuple
+
+from redis.asyncio import Redis
+
+# 画像缓存与版本号的过期时间(秒), 与会话上下文一致
+PORTRAIT_CACHE_TTL = 24 * 60 * 60
+
+
+def portrait_version_key(session_id: str) -> str:
+    return f"portrait:{session_id}:version"
+
+
+def portrait_cache_key(session_id: str) -> str:
+    return f"portrait:{session_id}:cache"
+
+
+async def bump_portrait_version(rds: Redis, session_id: str) -> int:
+    """
+    画像写入 Neo4j 后递增版本号, 使各 worker 的缓存失效
+    Args:
+        rds (Redis): Redis 连接(decode_responses=True)
+        session_id (str): 会话ID
+    Returns:
+        int: 新版本号
+    """
+    key = portrait_version_key(session_id)
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, PORTRAIT_CACHE_TTL)
+        version, _ = await pipe.execute()
+    return int(version)
+
+
+async def get_cached_portrait(
+    rds: Redis, session_id: str
+) -> Tuple[str, Optional[str]]:
+    """
+    读取当前版本号与缓存的画像文本
+    Returns:
+        Tuple[str, Optional[str]]: (当前版本号, 画像文本), 缓存不存在或版本不一致时文本为 None
+    """
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.get(portrait_version_key(session_id))
+        pipe.hgetall(portrait_cache_key(session_id))
+        version, cached = await pipe.execute()
+    version = version or "0"
+    if cached and cached.get("version") == version:
+        return version, cached.get("text")
+    return version, None
+
+
+async def set_cached_portrait(
+    rds: Redis, session_id: str, version: str, text: str
+) -> None:
+    """
+    缓存画像文本, version 须为读取 Neo4j 之前取得的版本号;
+    读取期间若有新的写入, 版本号已递增, 这份缓存下次读取时即被视为过期
+    """
+    key = portrait_cache_key(session_id)
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={"version": version, "text": text})
+        pipe.expire(key, PORTRAIT_CACHE_TTL)
+        await pipe.execute()
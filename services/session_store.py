@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:08:41
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : session_store.py
+# @License : Apache-2.0
+# @Desc    : 会话上下文存储(Redis 列表, 逐条追加) 与 token 台账
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from tokenizer import get_token_counts
+
+# 会话上下文过期时间(秒), 每次写入时刷新
+SESSION_CONTEXT_TTL = 24 * 60 * 60
+
+
+def session_context_key(session_id: str) -> str:
+    return f"session:{session_id}:context"
+
+
+def session_tokens_key(session_id: str) -> str:
+    # 会话上下文 token 总数, 与消息列表同步写入
+    return f"session:{session_id}:tokens"
+
+
+def _legacy_key(session_id: str) -> str:
+    # 旧版本整段 JSON 字符串存储的 key
+    return f"session:{session_id}:messages"
+
+
+async def _encode(messages: List[Dict[str, str]]) -> Tuple[List[str], int]:
+    # 每条消息只在写入时精确计数一次, token 数随消息一起保存
+    counts = await get_token_counts([message["content"] for message in messages])
+    entries = [
+        json.dumps(
+            {"role": message["role"], "content": message["content"], "tokens": tokens},
+            ensure_ascii=False,
+        )
+        for message, tokens in zip(messages, counts)
+    ]
+    return entries, sum(counts)
+
+
+async def reset_session_context(
+    rds: Redis, session_id: str, messages: List[Dict[str, str]]
+) -> int:
+    """
+    用 messages 整体替换会话上下文(新建会话、预加载、上下文压缩后)
+    Args:
+        rds (Redis): Redis 连接
+        session_id (str): 会话ID
+        messages (List[Dict[str, str]]): 消息列表
+    Returns:
+        int: 上下文 token 总数
+    """
+    key, tokens_key = session_context_key(session_id), session_tokens_key(session_id)
+    entries, total = await _encode(messages)
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.delete(key, tokens_key, _legacy_key(session_id))
+        if entries:
+            pipe.rpush(key, *entries)
+            pipe.set(tokens_key, total)
+            pipe.expire(key, SESSION_CONTEXT_TTL)
+            pipe.expire(tokens_key, SESSION_CONTEXT_TTL)
+        await pipe.execute()
+    return total
+
+
+async def append_session_context(
+    rds: Redis, session_id: str, messages: List[Dict[str, str]]
+) -> int:
+    """
+    向会话上下文末尾追加消息, 累加 token 总数并刷新过期时间, 只传输和计数新增消息
+    Args:
+        rds (Redis): Redis 连接
+        session_id (str): 会话ID
+        messages (List[Dict[str, str]]): 新增消息
+    Returns:
+        int: 追加后会话上下文的 token 总数
+    """
+    key, tokens_key = session_context_key(session_id), session_tokens_key(session_id)
+    if not messages:
+        return int(await rds.get(tokens_key) or 0)
+    entries, total = await _encode(messages)
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.rpush(key, *entries)
+        pipe.incrby(tokens_key, total)
+        pipe.expire(key, SESSION_CONTEXT_TTL)
+        pipe.expire(tokens_key, SESSION_CONTEXT_TTL)
+        _, session_total, *_ = await pipe.execute()
+    return int(session_total)
+
+
+async def load_session_context(
+    rds: Redis, session_id: str
+) -> Optional[Tuple[List[Dict[str, str]], int]]:
+    """
+    读取会话上下文
+    Args:
+        rds (Redis): Redis 连接
+        session_id (str): 会话ID
+    Returns:
+        Optional[Tuple[List[Dict[str, str]], int]]: (消息列表, token 总数), 会话不存在时为 None
+    """
+    key, tokens_key = session_context_key(session_id), session_tokens_key(session_id)
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.lrange(key, 0, -1)
+        pipe.get(tokens_key)
+        entries, total = await pipe.execute()
+    if not entries:
+        legacy = await rds.get(_legacy_key(session_id))
+        if not legacy:
+            return None
+        # 旧格式一次性迁移为列表
+        messages = json.loads(legacy)
+        total = await reset_session_context(rds, session_id, messages)
+        return messages, total
+
+    items = [json.loads(entry) for entry in entries]
+    messages = [{"role": item["role"], "content": item["content"]} for item in items]
+    if total is None:
+        # 台账缺失时按条目缓存的 token 数重建
+        total = sum(item["tokens"] for item in items)
+        await rds.set(tokens_key, total, ex=SESSION_CONTEXT_TTL)
+    return messages, int(total)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:52:34
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : stream.py
+# @License : Apache-2.0
+# @Desc    : 模型流式输出合并(按字符数或时间窗口攒批), 减少 SSE 帧数
+
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterator, List, Optional
+
+from config.config import Config
+
+
+async def coalesce_stream(
+    stream: AsyncIterator[Optional[str]],
+    max_chars: Optional[int] = None,
+    max_delay_ms: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    合并模型的逐 token 输出:
+    - 第一块立即下发, 不影响首字延迟
+    - 之后的增量先缓存, 累计达到 max_chars 个字符, 或距缓存中第一块到达已过 max_delay_ms 毫秒时合并下发
+    - 上游结束时下发剩余内容; 空块(如 delta.content 为 None)直接丢弃
+
+    等待上游时不取消其 __anext__, 超时只是先把缓存下发, 下一轮继续等同一个读取
+    max_chars <= 1 或 max_delay_ms <= 0 时不合并, 原样转发
+    """
+    max_chars = Config.chat_stream_coalesce_chars if max_chars is None else max_chars
+    max_delay_ms = (
+        Config.chat_stream_coalesce_ms if max_delay_ms is None else max_delay_ms
+    )
+    loop = asyncio.get_running_loop()
+    max_delay = max_delay_ms / 1000
+    iterator = stream.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    buffer: List[str] = []
+    size = 0
+    deadline = 0.0
+    first = True
+    try:
+        if max_chars <= 1 or max_delay_ms <= 0:
+            async for chunk in iterator:
+                if chunk:
+                    yield chunk
+            return
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            if buffer and not pending.done():
+                timeout = deadline - loop.time()
+                if timeout > 0:
+                    await asyncio.wait({pending}, timeout=timeout)
+                if not pending.done():
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                    continue
+            try:
+                chunk = await pending
+            except StopAsyncIteration:
+                pending = None
+                break
+            pending = None
+            if not chunk:
+                continue
+            if first:
+                first = False
+                yield chunk
+                continue
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # 提前关闭(如客户端断开、切换到工具调用后的新一轮生成)时停止读取上游:
+        # 先取消进行中的读取并等其结束(上游生成器不能在运行中关闭), 再关闭上游以释放 HTTP 流
+        if pending is not None:
+            pending.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await pending
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
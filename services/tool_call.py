@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:58:16
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : tool_call.py
+# @License : Apache-2.0
+# @Desc    : 流式回复中 [TOOL_CALL] 工具调用的增量解析
+
+import re
+import json
+from typing import List, Optional
+
+TOOL_CALL_PREFIX = "[TOOL_CALL]"
+
+# 字符串外需要关注的字符 / 字符串内需要关注的字符
+_STRUCT_CHARS = re.compile(r'[{}"/]')
+_STRING_CHARS = re.compile(r'["\\]')
+
+_PREFIX, _TEXT, _FENCE, _JSON, _DONE = range(5)
+
+
+class ToolCallParser:
+    """
+    逐块解析模型的一条回复, 回复要么是普通文本, 要么整条是工具调用:
+        [TOOL_CALL]
+        ```json
+        {"tool_name": "...", "tool_params": {...}}
+        ```
+
+    状态: 前缀匹配 -> 普通文本 / 围栏(跳过空白、```json) -> JSON 扫描 -> 完成
+    - 开头(忽略前导空白)一旦不可能是 [TOOL_CALL], 立即把已缓存内容作为文本下发
+    - JSON 部分按块扫描括号深度与字符串状态, 对象闭合时只调用一次 json.loads,
+      总耗时与负载长度线性相关; 字符串外的 // 行注释(提示词模板中带有)会被跳过
+
+    用法:
+        parser = ToolCallParser()
+        for chunk in stream:
+            if text := parser.feed(chunk):
+                ...  # 下发文本
+            if parser.done:
+                ...  # parser.tool_call 为解析出的字典, 解析失败时为 None, 原因见 parser.error
+        rest = parser.finish()  # 流结束时尚未下发的文本
+    """
+
+    def __init__(self):
+        self._state = _PREFIX
+        self._head = ""
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_comment = False
+        self._pending_slash = False
+        self.tool_call: Optional[dict] = None
+        self.tool_text: str = ""
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    @property
+    def in_tool_call(self) -> bool:
+        return self._state in (_FENCE, _JSON, _DONE)
+
+    def feed(self, chunk: str) -> str:
+        """
+        输入一块回复, 返回可以立即下发给前端的文本(可能为空串)
+        """
+        if not chunk or self._state == _DONE:
+            return ""
+        if self._state == _TEXT:
+            return chunk
+        if self._state == _PREFIX:
+            self._head += chunk
+            stripped = self._head.lstrip()
+            if stripped.startswith(TOOL_CALL_PREFIX):
+                self._state = _FENCE
+                chunk = stripped[len(TOOL_CALL_PREFIX) :]
+                self._head = ""
+            elif TOOL_CALL_PREFIX.startswith(stripped):
+                # 仍可能是工具调用(含只收到空白的情况), 继续等待
+                return ""
+            else:
+                self._state = _TEXT
+                text, self._head = self._head, ""
+                return text
+        if self._state == _FENCE:
+            start = chunk.find("{")
+            if start == -1:
+                # 跳过 [TOOL_CALL] 与 JSON 之间的换行、```json 围栏
+                return ""
+            self._state = _JSON
+            chunk = chunk[start:]
+        self._scan(chunk)
+        return ""
+
+    def finish(self) -> str:
+        """
+        流结束时调用, 返回缓存中尚未下发的文本; 工具调用未闭合时记录 error
+        """
+        if self._state == _PREFIX:
+            self._state = _TEXT
+            text, self._head = self._head, ""
+            return text
+        if self._state in (_FENCE, _JSON):
+            self.error = "incomplete tool call"
+            self._state = _DONE
+        return ""
+
+    def _scan(self, s: str) -> None:
+        parts = self._parts
+        i, n = 0, len(s)
+        start = 0
+        if self._pending_slash:
+            self._pending_slash = False
+            if s.startswith("/"):
+                self._in_comment = True
+                i = start = 1
+            else:
+                parts.append("/")
+        while i < n:
+            if self._in_comment:
+                j = s.find("\n", i)
+                if j == -1:
+                    return
+                self._in_comment = False
+                i = start = j
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                m = _STRING_CHARS.search(s, i)
+                if m is None:
+                    break
+                j = m.start()
+                if s[j] == "\\":
+                    if j + 1 < n:
+                        i = j + 2
+                    else:
+                        self._escape = True
+                        i = n
+                else:
+                    self._in_string = False
+                    i = j + 1
+                continue
+            m = _STRUCT_CHARS.search(s, i)
+            if m is None:
+                break
+            j = m.start()
+            c = s[j]
+            if c == '"':
+                self._in_string = True
+                i = j + 1
+            elif c == "{":
+                self._depth += 1
+                i = j + 1
+            elif c == "}":
+                self._depth -= 1
+                i = j + 1
+                if self._depth == 0:
+                    parts.append(s[start:i])
+                    self._complete()
+                    return
+            elif j + 1 == n:
+                # "/" 位于块尾, 等下一块确认是否为注释
+                parts.append(s[start:j])
+                self._pending_slash = True
+                return
+            elif s[j + 1] == "/":
+                parts.append(s[start:j])
+                self._in_comment = True
+                i = start = j + 2
+            else:
+                i = j + 1
+        parts.append(s[start:])
+
+    def _complete(self) -> None:
+        self._state = _DONE
+        self.tool_text = "".join(self._parts)
+        self._parts = []
+        try:
+            tool_call = json.loads(self.tool_text)
+        except json.JSONDecodeError as e:
+            self.error = f"invalid tool call json: {e}"
+            return
+        if not isinstance(tool_call, dict):
+            self.error = "tool call is not a json object"
+            return
+        self.tool_call = tool_call
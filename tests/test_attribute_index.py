@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:12:05
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_attribute_index.py
+# @License : Apache-2.0
+# @Desc    : 过滤条件归一化测试(模型生成的非字符串取值)
+
+import pytest
+
+from MCP.attribute_index import normalize_filters
+
+
+def test_scalar_values_are_coerced():
+    assert normalize_filters({"exp_requirement": 3}) == {"exp_requirement": ("3",)}
+    assert normalize_filters({"exp_requirement": 3.5}) == {"exp_requirement": ("3.5",)}
+    assert normalize_filters({"location": ["上海", 1]}) == {"location": ("1", "上海")}
+
+
+def test_dict_values_are_dropped():
+    assert normalize_filters({"location": {"city": "上海"}}) == {}
+    assert normalize_filters({"location": "北京", "edu_requirement": {"x": 1}}) == {
+        "location": ("北京",)
+    }
+
+
+def test_nested_list_values_are_dropped():
+    assert normalize_filters({"location": [["上海"], "北京", {"city": "深圳"}]}) == {
+        "location": ("北京",)
+    }
+    assert normalize_filters({"location": [[]], "edu_requirement": True}) == {}
+
+
+def test_unknown_field_still_rejected():
+    with pytest.raises(ValueError):
+        normalize_filters({"salary": "10k"})
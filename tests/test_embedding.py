@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:34:18
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_embedding.py
+# @License : Apache-2.0
+# @Desc    : 查询 embedding 不被批量索引占用的并发额度阻塞; 只重试可恢复的接口错误
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from MCP.embedding import AsyncOpenAIEmbeddings
+
+
+class _FakeEmbeddingsAPI:
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def create(self, input, model):
+        inputs = [input] if isinstance(input, str) else input
+        if len(inputs) > 1:
+            # 文档批次一直挂起, 模拟正在进行的全量索引
+            await self.release.wait()
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[float(i)]) for i in range(len(inputs))]
+        )
+
+
+def test_query_not_blocked_by_bulk_batches():
+    async def main():
+        emb = AsyncOpenAIEmbeddings("http://127.0.0.1", "none", "m", batch_size=2, max_concurrency=1)
+        api = _FakeEmbeddingsAPI()
+        emb.client = SimpleNamespace(embeddings=api)
+        bulk = asyncio.create_task(emb.aembed_documents(["a", "b", "c", "d"]))
+        await asyncio.sleep(0.05)
+        assert emb._get_semaphore().locked()
+        assert await asyncio.wait_for(emb.aembed_query("q"), timeout=1) == [0.0]
+        api.release.set()
+        assert len(await bulk) == 4
+
+    asyncio.run(main())
+
+
+def _status_error(cls, status: int):
+    request = httpx.Request("POST", "http://127.0.0.1/embeddings")
+    return cls("error", response=httpx.Response(status, request=request), body=None)
+
+
+class _FailingEmbeddingsAPI:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create(self, input, model):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[1.0])])
+
+
+def _embeddings(api, retry_backoff):
+    emb = AsyncOpenAIEmbeddings(
+        "http://127.0.0.1", "none", "m", max_retries=3, retry_backoff=retry_backoff
+    )
+    emb.client = SimpleNamespace(embeddings=api)
+    return emb
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        _status_error(openai.BadRequestError, 400),
+        _status_error(openai.AuthenticationError, 401),
+        ValueError("embedding count mismatch"),
+    ],
+)
+def test_non_retryable_errors_raise_immediately(error):
+    api = _FailingEmbeddingsAPI([error])
+    # 退避很长, 若发生重试测试会超时
+    emb = _embeddings(api, retry_backoff=10)
+    with pytest.raises(type(error)):
+        asyncio.run(asyncio.wait_for(emb.aembed_query("q"), timeout=1))
+    assert api.calls == 1
+
+
+def test_transient_errors_are_retried():
+    request = httpx.Request("POST", "http://127.0.0.1/embeddings")
+    api = _FailingEmbeddingsAPI(
+        [
+            _status_error(openai.RateLimitError, 429),
+            _status_error(openai.InternalServerError, 503),
+            openai.APITimeoutError(request=request),
+        ]
+    )
+    emb = _embeddings(api, retry_backoff=0)
+    assert asyncio.run(emb.aembed_query("q")) == [1.0]
+    assert api.calls == 4
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:06:47
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_index_store.py
+# @License : Apache-2.0
+# @Desc    : 分段索引存储的基线回滚测试(重启后仍生效)
+
+import os
+
+import numpy as np
+import pytest
+
+from MCP.index_store import SegmentedIndexStore
+
+
+def _save(marker: str):
+    def save_fn(path: str) -> None:
+        with open(os.path.join(path, "marker"), "w", encoding="utf-8") as f:
+            f.write(marker)
+
+    return save_fn
+
+
+def _delta(jids, deleted=()):
+    jids = np.asarray(jids, dtype=np.int64)
+    vectors = np.ones((len(jids), 4), dtype=np.float32)
+    return vectors, jids, np.asarray(deleted, dtype=np.int64)
+
+
+def test_rollback_base_survives_reopen(tmp_path):
+    index_dir = str(tmp_path)
+    store = SegmentedIndexStore(index_dir, keep_bases=1)
+    seq = store.append_delta(*_delta([1, 2]))
+    store.commit_base(seq, _save("good"))
+    good = store.manifest["base"]
+
+    seq = store.append_delta(*_delta([3], deleted=[1]))
+    store.commit_base(seq, _save("bad"))
+    bad = store.manifest["base"]
+    tail = store.append_delta(*_delta([4]))
+
+    # 被折叠进坏基线的增量段(新增 3、删除 1)由调用方合并后传回
+    store.rollback_base(good, seq, *_delta([3], deleted=[1]))
+
+    reopened = SegmentedIndexStore(index_dir, keep_bases=1)
+    assert reopened.manifest["base"] == good
+    assert not os.path.exists(os.path.join(index_dir, bad))
+    with open(os.path.join(reopened.base_path, "marker"), encoding="utf-8") as f:
+        assert f.read() == "good"
+    replay = [(s, jids.tolist(), deleted.tolist()) for s, _, jids, deleted in reopened.iter_deltas()]
+    assert replay == [(seq, [3], [1]), (tail, [4], [])]
+    assert reopened.manifest["generation"] > 2
+
+
+def test_rollback_base_requires_retained_base(tmp_path):
+    store = SegmentedIndexStore(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        store.rollback_base("base-00000009", 0, *_delta([]))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:20:41
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_job_search.py
+# @License : Apache-2.0
+# @Desc    : job_search_topn 过滤条件异常时退回不过滤检索
+
+import asyncio
+
+from MCP import vector_service
+from services import llm
+
+
+class _FakeService:
+    def __init__(self):
+        self.calls = []
+
+    async def search_async(self, query, topn, filters=None):
+        self.calls.append(filters)
+        if filters:
+            raise TypeError("bad filter value")
+        return [{"jid": 1}]
+
+
+def test_invalid_filters_fall_back_to_unfiltered(monkeypatch):
+    service = _FakeService()
+    monkeypatch.setattr(vector_service, "job_vector_service", service)
+    result = asyncio.run(llm.job_search_topn("前端", 3, {"location": object()}))
+    assert result == [{"jid": 1}]
+    assert len(service.calls) == 2 and service.calls[-1] is None
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 14:21:36
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_lexical_index.py
+# @License : Apache-2.0
+# @Desc    : 关键词倒排索引测试(锁外合并期间的写入与检索)
+
+import threading
+
+from MCP.lexical_index import LexicalIndex
+
+CITIES = ["上海", "北京", "深圳", "杭州"]
+
+
+def _text(jid: int, title: str = "开发") -> str:
+    return f"{title}工程师 {CITIES[jid % 4]} python"
+
+
+def _assert_same(index: LexicalIndex, docs: dict) -> None:
+    fresh = LexicalIndex(merge_threshold=10**9)
+    fresh.update(docs.items())
+    assert len(index) == len(docs)
+    # 未合并段中的已删除文档仍计入 df, 分数会有细微差异, 只比较命中集合
+    for query in ("上海 开发", "测试工程师", "北京", "python 深圳", "运维"):
+        got = {jid for jid, _ in index.search(query, 1000)}
+        want = {jid for jid, _ in fresh.search(query, 1000)}
+        assert got == want, query
+
+
+def test_writes_during_merge_are_kept():
+    index = LexicalIndex(merge_threshold=8)
+    docs = {jid: _text(jid) for jid in range(1, 21)}
+    index.update(docs.items())
+    build = index._build_merged
+    seen = {}
+
+    def build_with_writes(*args):
+        # 合并在锁外进行: 此时检索与写入都不应被阻塞
+        assert index._lock.acquire(blocking=False)
+        index._lock.release()
+        seen["during"] = dict(index.search("测试", 100))
+        index.update([(3, _text(3, "测试")), (100, _text(100, "测试"))], removed=[5, 101])
+        return build(*args)
+
+    index._build_merged = build_with_writes
+    new = {jid: _text(jid, "测试") for jid in range(101, 111)}
+    index.update(new.items(), removed=[7])
+    assert index._merging is None
+    # 合并期间封存段仍可检索
+    assert set(range(101, 111)) <= seen["during"].keys()
+    docs.update(new)
+    docs.update({3: _text(3, "测试"), 100: _text(100, "测试")})
+    for jid in (5, 7, 101):
+        docs.pop(jid)
+    _assert_same(index, docs)
+
+    # 合并后继续写入并再次合并, 序号仍一致
+    index._build_merged = build
+    more = {jid: _text(jid, "运维") for jid in range(200, 240)}
+    index.update(more.items(), removed=[1, 2])
+    docs.update(more)
+    docs.pop(1)
+    docs.pop(2)
+    _assert_same(index, docs)
+
+
+def test_concurrent_updates_and_searches():
+    index = LexicalIndex(merge_threshold=16)
+    errors = []
+
+    def writer(offset: int):
+        try:
+            for jid in range(offset, offset + 300):
+                index.update([(jid, _text(jid))], removed=[jid - 50] if jid % 3 == 0 else ())
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(200):
+                index.search("上海 开发", 10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i * 1000,)) for i in range(3)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    expected = {}
+    for offset in (0, 1000, 2000):
+        for jid in range(offset, offset + 300):
+            expected[jid] = _text(jid)
+        for jid in range(offset, offset + 300):
+            if jid % 3 == 0:
+                expected.pop(jid - 50, None)
+    _assert_same(index, expected)
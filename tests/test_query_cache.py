@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:32:18
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_query_cache.py
+# @License : Apache-2.0
+# @Desc    : 查询向量缓存并发合并测试(发起方被取消时其它等待方不受影响)
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from MCP.query_cache import QueryEmbeddingCache
+
+
+def test_owner_cancel_does_not_fail_waiters():
+    async def main():
+        cache = QueryEmbeddingCache("m")
+        started, release = asyncio.Event(), asyncio.Event()
+        calls = 0
+
+        async def compute(query):
+            nonlocal calls
+            calls += 1
+            started.set()
+            await release.wait()
+            return [1.0, 2.0]
+
+        owner = asyncio.create_task(cache.get_or_compute("Java 开发", compute))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_compute("java  开发", compute))
+        await asyncio.sleep(0)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+
+        release.set()
+        vec = await asyncio.wait_for(waiter, 1)
+        assert np.array_equal(vec, [1.0, 2.0])
+        assert calls == 1
+        # 计算结果已回填, 再次查询直接命中
+        assert np.array_equal(await cache.get_or_compute("JAVA 开发", compute), vec)
+        assert calls == 1
+
+    asyncio.run(main())
+
+
+def test_compute_error_propagates_and_is_not_cached():
+    async def main():
+        cache = QueryEmbeddingCache("m")
+
+        async def failing(query):
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("q", failing),
+            cache.get_or_compute("q", failing),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        async def compute(query):
+            return [3.0]
+
+        assert np.array_equal(await cache.get_or_compute("q", compute), [3.0])
+
+    asyncio.run(main())
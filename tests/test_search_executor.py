@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 16:08:27
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_search_executor.py
+# @License : Apache-2.0
+# @Desc    : 向量检索执行器测试(空闲时立即提交, 线程全忙时才攒批)
+
+import time
+import asyncio
+import threading
+
+import numpy as np
+
+from MCP.search_executor import BatchedSearchExecutor
+
+
+def _search_fn(gate: threading.Event = None, sizes: list = None):
+    def search(xq, k):
+        if sizes is not None:
+            sizes.append(len(xq))
+        if gate is not None:
+            gate.wait(5)
+        return [[(int(row[0]), 0.0)] for row in xq]
+
+    return search
+
+
+def test_idle_search_is_not_delayed_by_window():
+    async def main():
+        executor = BatchedSearchExecutor(_search_fn(), window=1.0, max_workers=1)
+        try:
+            start = time.perf_counter()
+            assert await executor.search([7.0], 1) == [(7, 0.0)]
+            return time.perf_counter() - start
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(main()) < 0.5
+
+
+def test_queries_batch_while_threads_are_busy():
+    async def main():
+        gate, sizes = threading.Event(), []
+        executor = BatchedSearchExecutor(
+            _search_fn(gate, sizes), window=10.0, max_batch=32, max_workers=1
+        )
+        try:
+            first = asyncio.create_task(executor.search([0.0], 1))
+            await asyncio.sleep(0.05)
+            # 唯一的线程被占用, 之后的查询排队; 窗口很长, 由批次完成触发提交
+            rest = [asyncio.create_task(executor.search([float(i)], 1)) for i in range(1, 6)]
+            await asyncio.sleep(0.05)
+            gate.set()
+            results = await asyncio.wait_for(asyncio.gather(first, *rest), 2)
+            assert [r[0][0] for r in results] == list(range(6))
+            assert sizes == [1, 5]
+        finally:
+            executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_burst_fills_free_threads_then_batches():
+    async def main():
+        gate, sizes = threading.Event(), []
+        executor = BatchedSearchExecutor(
+            _search_fn(gate, sizes), window=10.0, max_batch=3, max_workers=2
+        )
+        try:
+            tasks = [asyncio.create_task(executor.search([float(i)], 1)) for i in range(8)]
+            await asyncio.sleep(0.05)
+            gate.set()
+            await asyncio.wait_for(asyncio.gather(*tasks), 2)
+            # 前两个查询各占一个线程, 其余按 max_batch 攒批
+            assert sizes[:2] == [1, 1] and sum(sizes) == 8 and max(sizes) <= 3
+        finally:
+            executor.shutdown()
+
+    asyncio.run(main())
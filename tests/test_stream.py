@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 15:40:12
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_stream.py
+# @License : Apache-2.0
+# @Desc    : 流式输出合并测试(提前关闭时上游生成器一并关闭)
+
+import asyncio
+
+import pytest
+
+from services.stream import coalesce_stream
+
+
+def _upstream(closed: list, stall: float = 10):
+    async def gen():
+        try:
+            yield "a"
+            yield "b"
+            await asyncio.sleep(stall)
+            yield "c"
+        finally:
+            closed.append(True)
+
+    return gen()
+
+
+class _ResponseStream:
+    """
+    类似 HTTP 响应的上游: 取消一次读取不会关闭连接, 只有 aclose 才会
+    """
+
+    def __init__(self):
+        self.chunks = ["a", "b"]
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.chunks:
+            return self.chunks.pop(0)
+        await asyncio.sleep(10)
+        raise StopAsyncIteration
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_aclose_with_pending_read_closes_upstream():
+    async def main():
+        closed = []
+        stream = coalesce_stream(_upstream(closed), max_chars=100, max_delay_ms=10)
+        assert await stream.__anext__() == "a"
+        # 超时下发 "b" 时上游的下一次读取仍在进行
+        assert await stream.__anext__() == "b"
+        await stream.aclose()
+        assert closed == [True]
+
+    asyncio.run(main())
+
+
+def test_aclose_with_pending_read_closes_response_stream():
+    async def main():
+        upstream = _ResponseStream()
+        stream = coalesce_stream(upstream, max_chars=100, max_delay_ms=10)
+        assert [await stream.__anext__(), await stream.__anext__()] == ["a", "b"]
+        await stream.aclose()
+        assert upstream.closed
+
+    asyncio.run(main())
+
+
+def test_consumer_cancel_closes_upstream():
+    async def main():
+        closed = []
+        stream = coalesce_stream(_upstream(closed), max_chars=100, max_delay_ms=10_000)
+
+        async def consume():
+            async for _ in stream:
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert closed == [True]
+
+    asyncio.run(main())
+
+
+def test_passthrough_aclose_closes_upstream():
+    async def main():
+        closed = []
+        stream = coalesce_stream(_upstream(closed), max_chars=0, max_delay_ms=0)
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        assert closed == [True]
+
+    asyncio.run(main())
+
+
+def test_chunks_are_coalesced():
+    async def upstream():
+        for chunk in ["首", "a", "b", None, "c"]:
+            yield chunk
+
+    async def main():
+        return [c async for c in coalesce_stream(upstream(), max_chars=2, max_delay_ms=1000)]
+
+    assert asyncio.run(main()) == ["首", "ab", "c"]
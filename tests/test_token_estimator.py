@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 12:04:51
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_token_estimator.py
+# @License : Apache-2.0
+# @Desc    : 上下文超限判断与 token 台账测试, 以及估算误差在样例语料上的校验(需真实分词器)
+
+import os
+import asyncio
+
+import numpy as np
+import pytest
+
+from config.config import Config
+from services import session_store
+from tokenizer import estimator
+from tokenizer.deepseek_tokenizer import TOKENIZER_DIR
+
+
+def _patch_exact(monkeypatch, count):
+    calls = []
+
+    async def fake_count(messages):
+        calls.append(len(messages))
+        return count
+
+    monkeypatch.setattr(estimator, "get_messages_token_count", fake_count)
+    return calls
+
+
+def test_ledger_total_is_compared_without_tokenizing(monkeypatch):
+    calls = _patch_exact(monkeypatch, 0)
+    messages = [{"role": "user", "content": "你好"}] * 1000
+    for band in (0, 0.2):
+        assert asyncio.run(estimator.exceeds_token_limit(messages, 101, limit=100, band=band))
+        assert not asyncio.run(estimator.exceeds_token_limit(messages, 100, limit=100, band=band))
+    assert calls == []
+
+
+def test_zero_band_counts_exactly_without_ledger(monkeypatch):
+    calls = _patch_exact(monkeypatch, 150)
+    messages = [{"role": "user", "content": "你好"}]
+    assert asyncio.run(estimator.exceeds_token_limit(messages, limit=100, band=0))
+    assert calls == [1]
+
+
+def test_band_skips_exact_count_far_from_limit(monkeypatch):
+    calls = _patch_exact(monkeypatch, 0)
+    monkeypatch.setattr(estimator, "estimate_messages_token_count", lambda m: m[0]["estimate"])
+    far_below, far_above, near = ({"role": "user", "content": "x", "estimate": e} for e in (50, 150, 95))
+    assert not asyncio.run(estimator.exceeds_token_limit([far_below], limit=100, band=0.2))
+    assert asyncio.run(estimator.exceeds_token_limit([far_above], limit=100, band=0.2))
+    assert calls == []
+    assert not asyncio.run(estimator.exceeds_token_limit([near], limit=100, band=0.2))
+    assert calls == [1]
+
+
+def test_ledger_stores_exact_counts(monkeypatch):
+    async def fake_counts(texts):
+        return [len(text) * 7 for text in texts]
+
+    monkeypatch.setattr(session_store, "get_token_counts", fake_counts)
+    entries, total = asyncio.run(
+        session_store._encode([{"role": "user", "content": "ab"}, {"role": "assistant", "content": "c"}])
+    )
+    assert total == 21
+    assert '"tokens": 14' in entries[0] and '"tokens": 7' in entries[1]
+
+
+@pytest.mark.skipif(
+    not os.path.exists(os.path.join(TOKENIZER_DIR, "tokenizer.json")),
+    reason="需要 DeepSeek 的 tokenizer/tokenizer.json",
+)
+def test_estimate_error_within_band_on_sample_corpus():
+    from benchmarks.token_estimator import SAMPLE_CORPUS, _read_corpus
+    from tokenizer.deepseek_tokenizer import _count_tokens
+
+    if Config.token_estimate_band <= 0:
+        pytest.skip("估算未启用(系数未校准)")
+    texts = _read_corpus(SAMPLE_CORPUS)
+    exact = np.asarray(_count_tokens(texts), dtype=np.float64)
+    estimates = np.asarray([estimator.estimate_token_count(text) for text in texts], dtype=np.float64)
+    mask = exact >= 20
+    rel = np.abs(estimates[mask] - exact[mask]) / exact[mask]
+    # 启用估算时, 误差带必须覆盖样例语料上观测到的单条最大相对误差
+    assert rel.max() <= Config.token_estimate_band
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 15:02:44
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : test_tool_call.py
+# @License : Apache-2.0
+# @Desc    : [TOOL_CALL] 增量解析测试(分块边界、字符串转义、注释、非法 JSON、形似前缀的普通文本)
+
+import json
+
+import pytest
+
+from services.tool_call import ToolCallParser
+
+CALL = {"tool_name": "job_search_topn", "tool_params": {"query": "上海 Java 开发", "topn": 5}}
+REPLY = "[TOOL_CALL]\n```json\n" + json.dumps(CALL, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _feed(chunks):
+    parser = ToolCallParser()
+    text = "".join(parser.feed(chunk) for chunk in chunks)
+    return parser, text + parser.finish()
+
+
+def _split(reply: str, size: int):
+    return [reply[i : i + size] for i in range(0, len(reply), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 11, 1000])
+def test_chunk_boundaries(size):
+    parser, text = _feed(_split(REPLY, size))
+    assert text == ""
+    assert parser.tool_call == CALL and parser.error is None
+
+
+def test_boundaries_inside_prefix_and_fence():
+    chunks = ["  \n[TOOL", "_CA", "LL]", "\n`", "``js", "on\n", '{"tool_name": "x", ', '"tool_params": {}}', "\n``", "`"]
+    parser, text = _feed(chunks)
+    assert text == ""
+    assert parser.tool_call == {"tool_name": "x", "tool_params": {}}
+
+
+def test_rest_after_tool_call_is_dropped():
+    parser = ToolCallParser()
+    for chunk in ["[TOOL_CALL]\n```json\n", '{"tool_name": "x"}', "\n```", "\n以上为调用"]:
+        assert parser.feed(chunk) == ""
+    assert parser.done and parser.finish() == ""
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 1000])
+def test_escaped_quotes_and_braces_in_strings(size):
+    call = {"tool_name": "t", "tool_params": {"query": 'a "}" {b} \\" \\\\', "k": "}}}{{"}}
+    reply = "[TOOL_CALL]\n```json\n" + json.dumps(call) + "\n```"
+    parser, _ = _feed(_split(reply, size))
+    assert parser.tool_call == call and parser.error is None
+
+
+@pytest.mark.parametrize("size", [1, 2, 4, 1000])
+def test_line_comments_outside_strings(size):
+    reply = (
+        "[TOOL_CALL]\n```json\n{\n"
+        '  "tool_name": "job_search_topn", // 工具名 {\n'
+        '  "tool_params": {"query": "http://a.b//c", "topn": 3} // 数量 }\n'
+        "}\n```"
+    )
+    parser, _ = _feed(_split(reply, size))
+    assert parser.error is None
+    assert parser.tool_call == {
+        "tool_name": "job_search_topn",
+        "tool_params": {"query": "http://a.b//c", "topn": 3},
+    }
+
+
+def test_malformed_json():
+    parser, text = _feed(["[TOOL_CALL]\n```json\n", '{"tool_name": "x",}', "\n```"])
+    assert text == ""
+    assert parser.done and parser.tool_call is None
+    assert parser.error.startswith("invalid tool call json")
+
+
+def test_incomplete_tool_call():
+    parser, text = _feed(["[TOOL_CALL]\n```json\n", '{"tool_name": "x"'])
+    assert text == "" and parser.tool_call is None
+    assert parser.error == "incomplete tool call"
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ["[TOOL", "S] 可以帮你"],
+        ["  [", "T", "x"],
+        ["[TOOL_CAL", "LED]"],
+        ["[TOOL_CALL"],
+        ["  "],
+    ],
+)
+def test_plain_text_that_starts_like_the_prefix(chunks):
+    parser, text = _feed(chunks)
+    assert text == "".join(chunks)
+    assert parser.tool_call is None and parser.error is None and not parser.in_tool_call
+
+
+def test_plain_text_is_streamed_without_delay():
+    parser = ToolCallParser()
+    assert parser.feed("[TO") == ""
+    assert parser.feed("P 10 岗位") == "[TOP 10 岗位"
+    assert parser.feed("如下") == "如下"
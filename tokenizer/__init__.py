@@ -5,6 +5,22 @@
 # @License : Apache-2.0
 # @Desc    :
 
-from .deepseek_tokenizer import get_token_count, get_messages_token_count
+from .deepseek_tokenizer import (
+    get_token_count,
+    get_token_counts,
+    get_messages_token_count,
+)
+from .estimator import (
+    estimate_token_count,
+    estimate_messages_token_count,
+    exceeds_token_limit,
+)
 
-__all__ = ["get_token_count", "get_messages_token_count"]
+__all__ = [
+    "get_token_count",
+    "get_token_counts",
+    "get_messages_token_count",
+    "estimate_token_count",
+    "estimate_messages_token_count",
+    "exceeds_token_limit",
+]
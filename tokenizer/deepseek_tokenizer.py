@@ -1,11 +1,43 @@
+import os
 import asyncio
-from transformers import AutoTokenizer
+import threading
 
-tokenizer = AutoTokenizer.from_pretrained("./tokenizer", trust_remote_code=True)
+TOKENIZER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """
+    首次使用时加载分词器, 直接使用 tokenizers(Rust) 读取 tokenizer.json, 不依赖 transformers
+    worker 启动时不再加载, 多线程并发首次调用只加载一次
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                from tokenizers import Tokenizer
+
+                _tokenizer = Tokenizer.from_file(
+                    os.path.join(TOKENIZER_DIR, "tokenizer.json")
+                )
+    return _tokenizer
+
+
+def _encode(text: str) -> list[int]:
+    # tokenizer_config.json 中 add_bos_token / add_eos_token 均为 false, 不添加特殊 token
+    return get_tokenizer().encode(text, add_special_tokens=False).ids
+
+
+def _count_tokens(texts: list[str]) -> list[int]:
+    # encode_batch 在 Rust 侧一次处理整批文本
+    encodings = get_tokenizer().encode_batch(texts, add_special_tokens=False)
+    return [len(encoding.ids) for encoding in encodings]
 
 
 async def async_encode(text):
-    return await asyncio.to_thread(tokenizer.encode, text)
+    return await asyncio.to_thread(_encode, text)
 
 
 async def get_token_count(text: str) -> int:
@@ -13,8 +45,13 @@ async def get_token_count(text: str) -> int:
     return len(tokens)
 
 
+async def get_token_counts(texts: list[str]) -> list[int]:
+    # 多条文本在同一次线程切换中计数, 避免每条消息各占一次默认线程池
+    if not texts:
+        return []
+    return await asyncio.to_thread(_count_tokens, texts)
+
+
 async def get_messages_token_count(messages: list[dict[str, str]]) -> int:
-    token_count = 0
-    for message in messages:
-        token_count += await get_token_count(message["content"])
-    return token_count
+    counts = await get_token_counts([message["content"] for message in messages])
+    return sum(counts)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:41:19
+# @Author  : 墨烟行(GitHub UserName: CloudSwordSage)
+# @File    : estimator.py
+# @License : Apache-2.0
+# @Desc    : 按字符类别的 token 数估算(未校准, 默认关闭), 仅在接近上下文上限时调用分词器精确计数
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config.config import Config
+
+from .deepseek_tokenizer import get_messages_token_count
+
+# 中日韩文字、假名、谚文及全角标点
+_CJK = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff"
+    r"\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+_SPACE = re.compile(r"[ \t\n\r\f\v]")
+
+# 每类字符对应的 token 数: (CJK, 其余 ASCII, 空白, 其余非 ASCII)
+# 当前为 DeepSeek 文档的经验比例(中文 1 字约 0.6 token, 英文 1 字符约 0.3 token), 尚未实测;
+# 需以真实分词器在 benchmarks/data/token_corpus.jsonl 上运行 python -m benchmarks.token_estimator,
+# 用拟合系数替换并把观测到的最大相对误差设为 token_estimate_band, 在此之前 band 默认为 0(不使用估算);
+# tests/test_token_estimator.py 在存在 tokenizer.json 时检查 band 覆盖样例语料上的实际误差
+ESTIMATE_COEFFICIENTS: Tuple[float, float, float, float] = (0.6, 0.3, 0.1, 1.0)
+
+
+def char_classes(text: str) -> Tuple[int, int, int, int]:
+    """
+    统计 (CJK, 其余 ASCII, 空白, 其余非 ASCII) 字符数, 一次正则扫描 O(len(text))
+    """
+    spaces = len(_SPACE.findall(text))
+    if text.isascii():
+        return 0, len(text) - spaces, spaces, 0
+    cjk = len(_CJK.findall(text))
+    ascii_chars = len(text.encode("ascii", "ignore")) - spaces
+    return cjk, ascii_chars, spaces, len(text) - cjk - ascii_chars - spaces
+
+
+def estimate_token_count(
+    text: str, coefficients: Tuple[float, float, float, float] = ESTIMATE_COEFFICIENTS
+) -> int:
+    counts = char_classes(text)
+    return int(round(sum(c * w for c, w in zip(counts, coefficients))))
+
+
+def estimate_messages_token_count(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_token_count(message["content"]) for message in messages)
+
+
+async def exceeds_token_limit(
+    messages: List[Dict[str, str]],
+    tokens: Optional[int] = None,
+    limit: Optional[int] = None,
+    band: Optional[float] = None,
+) -> bool:
+    """
+    判断上下文是否超过 token 上限
+    已知精确 token 总数(会话 token 台账)时直接比较, 不重新分词;
+    否则 band > 0 时先按字符类别估算, 估算值距上限超出 band(相对误差)时直接给出结论,
+    只有落在 [limit*(1-band), limit*(1+band)] 区间内才用分词器精确计数; band <= 0 时直接精确计数
+    Args:
+        messages (List[Dict[str, str]]): 完整上下文
+        tokens (Optional[int]): 已知的精确 token 总数, 为空时现场计算
+        limit (Optional[int]): 上限, 默认 Config.context_token_limit
+        band (Optional[float]): 估算误差带, 默认 Config.token_estimate_band, <=0 表示不使用估算
+    Returns:
+        bool: 是否超过上限
+    """
+    limit = Config.context_token_limit if limit is None else limit
+    if tokens is not None:
+        return tokens > limit
+    band = Config.token_estimate_band if band is None else band
+    if band > 0:
+        estimate = estimate_messages_token_count(messages)
+        if estimate < limit * (1 - band):
+            return False
+        if estimate > limit * (1 + band):
+            return True
+    return await get_messages_token_count(messages) > limit
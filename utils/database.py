@@ -48,6 +48,15 @@ redis_client = redis.Redis(
     max_connections=10000,  # 最大连接数，避免高并发时阻塞
 )
 
+# 二进制 Redis 客户端，用于存取向量等原始字节数据
+redis_binary_client = redis.Redis(
+    host=Config.redis_host,
+    port=Config.redis_port,
+    db=Config.redis_database,
+    decode_responses=False,
+    max_connections=1000,
+)
+
 # --- MongoDB 配置 ---
 mongo_uri = (
     (
@@ -94,6 +103,7 @@ async def get_neo4j() -> Neo4jAsyncSession:
 
 async def shutdown():
     await redis_client.aclose()
+    await redis_binary_client.aclose()
     mongo_client.close()
     await neo4j_driver.close()
     await engine.dispose()